@@ -1,11 +1,24 @@
 import streamlit as st
-import requests
 import math
+import numpy as np
 import pandas as pd
 import plotly.graph_objects as go
 import plotly.express as px
 from datetime import datetime
 import time
+import io
+import os
+
+from lp8020 import metrics
+from lp8020.export import export_grid, grid_axis, grid_rows, make_grid
+from lp8020.graph import Graph
+from lp8020.il_engine import POOL_WEIGHTS, calculate_impermanent_loss_80_20
+from lp8020.pools import DEFAULT_POOL, ConcentratedPool, DynamicWeightPool, WeightedPool, compare_impermanent_loss
+from lp8020.portfolio import Portfolio
+from lp8020.price_service import get_default_service
+from lp8020.price_store import get_default_store, series_name
+from lp8020.surface import downsample_surface, il_surface
+from lp8020.tables import TABLE_CSS, scenario_tables
 
 st.set_page_config(
     page_title="IL Calculator - 80/20 Pool",
@@ -14,86 +27,74 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-def calculate_impermanent_loss_80_20(p0_a, p0_b, p1_a, p1_b):
-    price_change_a = p1_a / p0_a
-    price_change_b = p1_b / p0_b
-    
-    w_a = 0.8
-    w_b = 0.2
-    
-    pool_value_ratio = (price_change_a ** w_a) * (price_change_b ** w_b)
-    
-    hold_value_ratio = (price_change_a * w_a) + (price_change_b * w_b)
-    
-    il_ratio = pool_value_ratio / hold_value_ratio
-    il_percentage = (il_ratio - 1) * 100
-    
-    return il_percentage, pool_value_ratio
-
 def get_initia_price():
     try:
-        url = "https://api.coingecko.com/api/v3/simple/price"
-        params = {
-            'ids': 'initia',
-            'vs_currencies': 'usd',
-            'include_24hr_change': 'true',
-            'include_last_updated_at': 'true'
-        }
-        
-        response = requests.get(url, params=params, timeout=10)
-        
-        if response.status_code == 200:
-            data = response.json()
-            if 'initia' in data:
-                price = data['initia']['usd']
-                change_24h = data['initia'].get('usd_24h_change', 0)
-                last_updated = data['initia'].get('last_updated_at', int(time.time()))
-                return price, change_24h, last_updated
-        
-        return None, None, None
+        quote = get_default_service().get_quotes(['initia']).get('initia')
+        if quote is None:
+            return None, None, None, None
+        return quote.price, quote.change_24h, quote.last_updated, quote.fetched_at
     except Exception as e:
         st.error(f"Error fetching Initia price: {str(e)}")
-        return None, None, None
+        return None, None, None, None
+
+def get_usdc_price():
+    try:
+        quote = get_default_service().get_quotes(['usd-coin']).get('usd-coin')
+        return quote.price if quote is not None else 1.0
+    except Exception:
+        return 1.0
+
+def get_price_history(asset_id, days=30, max_points=2000):
+    try:
+        history = get_default_store().read(series_name(asset_id, 'usd'), since=time.time() - days * 86400)
+    except OSError:
+        return None
+    step = max(1, len(history.timestamp) // max_points)
+    return history.timestamp[::step], history.price[::step]
+
+def create_price_history_chart(timestamps, prices, title):
+    fig = go.Figure(data=go.Scatter(
+        x=pd.to_datetime(np.asarray(timestamps), unit='s'),
+        y=np.asarray(prices),
+        mode='lines',
+        line=dict(color='#4facfe', width=2),
+        hovertemplate='%{x|%Y-%m-%d %H:%M}<br>$%{y:.4f}<extra></extra>'
+    ))
+    fig.update_layout(
+        title=dict(text=title, font=dict(size=20, color='white')),
+        paper_bgcolor='rgba(0,0,0,0)',
+        plot_bgcolor='rgba(0,0,0,0)',
+        font=dict(color='white', size=14),
+        height=350
+    )
+    return fig
 
 def create_il_chart(scenarios, il_values, title):
     return None
 
-def create_price_impact_surface():
-    price_multipliers = [0.1, 0.25, 0.5, 0.75, 1.0, 1.25, 1.5, 2.0, 3.0, 4.0, 5.0, 10.0, 20.0]
-    
-    x, y, z = [], [], []
+def create_price_impact_surface(pool=DEFAULT_POOL, resolution=500, max_points=150):
+    x, y, z = il_surface(low=0.1, high=20.0, resolution=resolution, log_spaced=True, pool=pool)
+    # Only a downsampled float32 copy is shipped to the browser.
+    x, y, z = downsample_surface(x, y, z, max_points=max_points)
+    x, y, z = x.astype(np.float32), y.astype(np.float32), z.astype(np.float32)
     
-    for mult_a in price_multipliers:
-        for mult_b in price_multipliers:
-            il, _ = calculate_impermanent_loss_80_20(1.0, 1.0, mult_a, mult_b)
-            il = abs(il)  # Make IL always positive for display
-            x.append(mult_a)
-            y.append(mult_b)
-            z.append(il)
-    
-    fig = go.Figure(data=go.Scatter3d(
+    fig = go.Figure(data=go.Surface(
         x=x, y=y, z=z,
-        mode='markers',
-        marker=dict(
-            size=4,
-            color=z,
-            colorscale='Reds',
-            colorbar=dict(title=dict(text="IL %", font=dict(size=16)), titlefont=dict(size=16), tickfont=dict(size=14)),
-            opacity=0.8
-        ),
+        # Diverging scale centred on zero: red is a loss vs HODL, blue a gain.
+        colorscale='RdBu',
+        cmid=0,
+        colorbar=dict(title=dict(text="IL %", font=dict(size=16)), tickfont=dict(size=14)),
+        opacity=0.9,
         hovertemplate='Asset A: %{x:.2f}x<br>Asset B: %{y:.2f}x<br>IL: %{z:.2f}%<extra></extra>'
     ))
     
     fig.update_layout(
-        title=dict(text="Impermanent Loss Surface (80/20 Pool)", font=dict(size=24, color='white')),
+        title=dict(text=f"Impermanent Loss Surface ({pool.label} Pool)", font=dict(size=24, color='white')),
         scene=dict(
-            xaxis_title="Asset A Price Multiplier",
-            yaxis_title="Asset B Price Multiplier", 
-            zaxis_title="Impermanent Loss (%)",
             bgcolor='rgba(0,0,0,0)',
-            xaxis=dict(titlefont=dict(size=16), tickfont=dict(size=14)),
-            yaxis=dict(titlefont=dict(size=16), tickfont=dict(size=14)),
-            zaxis=dict(titlefont=dict(size=16), tickfont=dict(size=14))
+            xaxis=dict(title=dict(text="Asset A Price Multiplier", font=dict(size=16)), tickfont=dict(size=14), type='log'),
+            yaxis=dict(title=dict(text="Asset B Price Multiplier", font=dict(size=16)), tickfont=dict(size=14), type='log'),
+            zaxis=dict(title=dict(text="Impermanent Loss (%)", font=dict(size=16)), tickfont=dict(size=14))
         ),
         paper_bgcolor='rgba(0,0,0,0)',
         font=dict(color='white', size=16),
@@ -102,6 +103,53 @@ def create_price_impact_surface():
     
     return fig
 
+def create_pool_comparison_chart(pool, resolution=400):
+    # Asset A moves, asset B is flat; one vectorized pass over all models.
+    pools = [WeightedPool(weights[0]) for weights in POOL_WEIGHTS.values()]
+    if pool not in pools:
+        pools.append(pool)
+    multipliers = np.geomspace(0.1, 20.0, resolution)
+    il = compare_impermanent_loss(pools, multipliers, 1.0)
+
+    fig = go.Figure()
+    for p, values in zip(pools, il):
+        fig.add_trace(go.Scatter(
+            x=multipliers, y=values, mode='lines', name=p.label,
+            line=dict(width=4 if p == pool else 2),
+            hovertemplate='Asset A: %{x:.2f}x<br>IL: %{y:.2f}%<extra>' + p.label + '</extra>'
+        ))
+    fig.update_layout(
+        title=dict(text="Impermanent Loss by Pool Model", font=dict(size=24, color='white')),
+        xaxis=dict(title=dict(text="Asset A Price Multiplier", font=dict(size=16)), tickfont=dict(size=14), type='log'),
+        yaxis=dict(title=dict(text="Impermanent Loss (%)", font=dict(size=16)), tickfont=dict(size=14)),
+        paper_bgcolor='rgba(0,0,0,0)',
+        plot_bgcolor='rgba(0,0,0,0)',
+        font=dict(color='white', size=16),
+        height=500
+    )
+    return fig
+
+def select_pool_model():
+    # Sidebar choice of pool model used by the scenario tables, the surface
+    # and the comparison chart.
+    st.sidebar.header("🧮 Pool Model")
+    model = st.sidebar.selectbox("Model", ["Weighted", "Concentrated range", "Liquidity bootstrapping (LBP)"], key="pool_model")
+    try:
+        if model == "Weighted":
+            preset = st.sidebar.selectbox("Weights", list(POOL_WEIGHTS), index=list(POOL_WEIGHTS).index("80/20"), key="pool_weights")
+            return WeightedPool(POOL_WEIGHTS[preset][0])
+        if model == "Concentrated range":
+            lower = st.sidebar.number_input("Lower bound (x entry price)", value=0.5, min_value=0.0001, step=0.05, key="pool_lower")
+            upper = st.sidebar.number_input("Upper bound (x entry price)", value=2.0, min_value=0.0001, step=0.05, key="pool_upper")
+            return ConcentratedPool(lower, upper)
+        w_start = st.sidebar.slider("Start weight (asset A)", 0.01, 0.99, 0.9, key="pool_w_start")
+        w_end = st.sidebar.slider("End weight (asset A)", 0.01, 0.99, 0.5, key="pool_w_end")
+        elapsed = st.sidebar.slider("Schedule elapsed", 0.0, 1.0, 1.0, key="pool_elapsed")
+        return DynamicWeightPool(w_start, w_end, elapsed)
+    except ValueError as e:
+        st.sidebar.error(f"❌ {str(e)}")
+        return DEFAULT_POOL
+
 st.markdown("""
 <style>
     .main-header {
@@ -156,6 +204,8 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
+st.markdown(f"<style>{TABLE_CSS}</style>", unsafe_allow_html=True)
+
 st.markdown("""
 <div class="main-header">
     <h1>🔄 Impermanent Loss Calculator</h1>
@@ -169,33 +219,89 @@ st.markdown("""
 </div>
 """, unsafe_allow_html=True)
 
-tab1 = st.tabs(["🪙 Initia/USDC Analysis"])[0]
+PRICE_REFRESH_SECONDS = 30
 
-with tab1:
-    st.header("General 80/20 LP Impermanent Loss Calculator")
+# The download is assembled on disk in chunks, but Streamlit still serves the
+# finished file from memory; bigger grids belong to `python -m lp8020 export`.
+# Streamlit holds the whole download in memory for every session that asks for
+# it, so the UI only builds grids that stay small (tens of MB as CSV); larger
+# ones go through the streaming CLI.
+EXPORT_MAX_ROWS = 500_000
+
+def build_page_graph():
+    # Per-session dependency graph: price -> scenario rows -> tables/DataFrame,
+    # and calculator inputs -> calculator result. Nodes are memoized on their
+    # inputs, so a rerun that changes nothing recomputes nothing.
+    graph = Graph()
+    graph.input("calculator_inputs")
+    graph.input("init_price")
+    graph.input("usdc_price")
+    graph.input("pool")
     
-    col1, col2 = st.columns(2)
+    # Scenarios are quoted in the pool's own unit, INIT/USDC. The stable leg
+    # is held flat inside a scenario, so IL only depends on the INIT move,
+    # but the prices and dollar values follow the live USDC quote. Early
+    # cutoff keeps an unchanged ratio from rebuilding the tables.
+    @graph.node("init_usdc_price", deps=("init_price", "usdc_price"))
+    def init_usdc_price(init_price, usdc_price):
+        return init_price / usdc_price if usdc_price else init_price
+    
+    @graph.node("calculator_result", deps=("calculator_inputs",))
+    def calculator_result(inputs):
+        return calculate_impermanent_loss_80_20(*inputs)
+    
+    @graph.node("scenario_tables", deps=("init_usdc_price", "pool"))
+    def initia_scenario_tables(init_usdc_price, pool):
+        return scenario_tables(init_usdc_price, pool=pool)
     
+    @graph.node("complete_dataframe", deps=("scenario_tables",))
+    def complete_dataframe(tables):
+        return pd.DataFrame(tables.complete)
+    
+    @graph.node("surface_figure", deps=("pool",))
+    def surface_figure(pool):
+        return create_price_impact_surface(pool)
+    
+    @graph.node("comparison_figure", deps=("pool",))
+    def comparison_figure(pool):
+        return create_pool_comparison_chart(pool)
+    
+    return graph
+
+def get_page_graph():
+    if "page_graph" not in st.session_state:
+        st.session_state["page_graph"] = build_page_graph()
+    return st.session_state["page_graph"]
+
+# Each section is a fragment: interacting with one (e.g. the Calculate button)
+# reruns only that section instead of the whole script.
+@st.fragment
+def render_general_calculator():
+    st.header("General 80/20 LP Impermanent Loss Calculator")
+
+    col1, col2 = st.columns(2)
+
     with col1:
         st.subheader("🏁 Initial Prices")
         initial_price_a = st.number_input("Initial Price Asset A ($)", value=0.5, min_value=0.0001, step=0.0001, key="init_a")
         initial_price_b = st.number_input("Initial Price Asset B ($)", value=1.0, min_value=0.01, step=0.01, key="init_b")
-    
+
     with col2:
         st.subheader("🎯 Future Prices")
         future_price_a = st.number_input("Future Price Asset A ($)", value=1.0, min_value=0.0001, step=0.0001, key="future_a")
         future_price_b = st.number_input("Future Price Asset B ($)", value=1.0, min_value=0.01, step=0.01, key="future_b")
-    
+
+    graph = get_page_graph()
+    graph.set("calculator_inputs", (initial_price_a, initial_price_b, future_price_a, future_price_b))
+
     if st.button("🔄 Calculate Impermanent Loss", type="primary"):
-        il_percentage, pool_value_ratio = calculate_impermanent_loss_80_20(
-            initial_price_a, initial_price_b, future_price_a, future_price_b
-        )
-        
+        il_percentage, pool_value_ratio = graph.get("calculator_result")
+
         price_change_a = ((future_price_a / initial_price_a) - 1) * 100
         price_change_b = ((future_price_b / initial_price_b) - 1) * 100
-        
+
         col1, col2, col3 = st.columns(3)
-        
+
         with col1:
             st.markdown(f"""
             <div class="metric-card">
@@ -203,7 +309,7 @@ with tab1:
                 <h2>{il_percentage:.2f}%</h2>
             </div>
             """, unsafe_allow_html=True)
-        
+
         with col2:
             st.markdown(f"""
             <div class="metric-card">
@@ -211,7 +317,7 @@ with tab1:
                 <h2>{pool_value_ratio:.4f}</h2>
             </div>
             """, unsafe_allow_html=True)
-        
+
         with col3:
             st.markdown(f"""
             <div class="metric-card">
@@ -219,7 +325,7 @@ with tab1:
                 <h2>{((future_price_a/future_price_b)/(initial_price_a/initial_price_b)-1)*100:.2f}%</h2>
             </div>
             """, unsafe_allow_html=True)
-        
+
         if il_percentage < -1:
             st.markdown(f"""
             <div class="warning-card">
@@ -235,14 +341,18 @@ with tab1:
             </div>
             """, unsafe_allow_html=True)
 
+@st.fragment(run_every=PRICE_REFRESH_SECONDS)
+def render_initia_analysis():
     st.header("🪙 Initia (INIT) / USDC Pool Analysis")
-    
+
     with st.spinner("🔄 Fetching current INIT price..."):
-        current_init_price, price_change_24h, last_updated = get_initia_price()
-    
+        with metrics.span("fetch"):
+            current_init_price, price_change_24h, last_updated, fetched_at = get_initia_price()
+            current_usdc_price = get_usdc_price()
+
     if current_init_price:
         col1, col2, col3 = st.columns(3)
-        
+
         with col1:
             change_color = "#44ff44" if price_change_24h >= 0 else "#ff4444"
             st.markdown(f"""
@@ -252,159 +362,244 @@ with tab1:
                 <p style="color: {change_color};">24h: {price_change_24h:+.2f}%</p>
             </div>
             """, unsafe_allow_html=True)
-        
+
         with col2:
             st.markdown(f"""
             <div class="price-card">
                 <h3>💵 USDC Price</h3>
-                <h2>$1.0000</h2>
+                <h2>${current_usdc_price:.4f}</h2>
                 <p style="color: #888;">Stable</p>
             </div>
             """, unsafe_allow_html=True)
-        
+
         with col3:
             update_time = datetime.fromtimestamp(last_updated).strftime("%H:%M:%S")
+            # Past the feed's TTL the quote is being served stale (upstream
+            # is slow, failing or rate limiting us).
+            age = time.time() - fetched_at
+            if age < get_default_service().feed.ttl:
+                freshness = '<p>Real-time data</p>'
+            else:
+                ago = f"{age:.0f}s" if age < 120 else f"{age / 60:.0f} min"
+                freshness = f'<p style="color: #ffaa00;">⚠️ Stale: fetched {ago} ago</p>'
             st.markdown(f"""
             <div class="price-card">
                 <h3>🕒 Last Updated</h3>
                 <h2>{update_time}</h2>
-                <p>Real-time data</p>
+                {freshness}
             </div>
             """, unsafe_allow_html=True)
-        
+
+        history = get_price_history('initia')
+        if history is not None and len(history[0]) > 1:
+            with st.expander("📈 INIT Price History"):
+                with metrics.span("render.price_history"):
+                    st.plotly_chart(create_price_history_chart(*history, "INIT Price (30d)"), use_container_width=True)
+
         st.subheader("📈 Price Pump Scenarios")
-        
-        pump_scenarios = ["2x", "4x", "10x", "20x"]
-        pump_multipliers = [2, 4, 10, 20]
-        pump_il_values = []
-        
-        for multiplier in pump_multipliers:
-            future_init_price = current_init_price * multiplier
-            il, _ = calculate_impermanent_loss_80_20(current_init_price, 1.0, future_init_price, 1.0)
-            pump_il_values.append(abs(il))
-        
+
         st.subheader("💰 HODL vs LP Comparison (Increasing INIT value)")
-        
-        hodl_data = []
-        for scenario, multiplier in zip(pump_scenarios, pump_multipliers):
-            new_price = current_init_price * multiplier
-            il_actual, _ = calculate_impermanent_loss_80_20(current_init_price, 1.0, new_price, 1.0)
-            
-            hodl_100_init = 1000 * multiplier
-            
-            hodl_80_20_init = 800 * multiplier
-            hodl_80_20_usdc = 200
-            hodl_80_20_total = hodl_80_20_init + hodl_80_20_usdc
-            
-            lp_value = hodl_80_20_total * (1 + il_actual/100)
-            
-            difference_100 = hodl_100_init - lp_value
-            difference_80_20 = hodl_80_20_total - lp_value
-            
-            hodl_data.append([
-                scenario,
-                f"${new_price:.4f}",
-                f"${hodl_100_init:.0f}",
-                f"${hodl_80_20_total:.0f}",
-                f"${lp_value:.0f}",
-                f"{abs(il_actual):.2f}%",
-                f"${difference_100:.0f}",
-                f"${difference_80_20:.0f}"
-            ])
-        
-        table_html = f"""<div style="margin: 20px 0;"><table style="width: 100%; border-collapse: collapse; background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); border-radius: 15px; overflow: hidden; box-shadow: 0 8px 25px rgba(102, 126, 234, 0.3);"><thead><tr style="background: rgba(0,0,0,0.4);"><th style="padding: 20px; text-align: center; color: white; font-weight: bold; font-size: 18px; border-bottom: 2px solid rgba(255,255,255,0.3);">Scenario</th><th style="padding: 20px; text-align: center; color: white; font-weight: bold; font-size: 18px; border-bottom: 2px solid rgba(255,255,255,0.3);">INIT Price</th><th style="padding: 20px; text-align: center; color: white; font-weight: bold; font-size: 18px; border-bottom: 2px solid rgba(255,255,255,0.3);">HODL 100% INIT</th><th style="padding: 20px; text-align: center; color: white; font-weight: bold; font-size: 18px; border-bottom: 2px solid rgba(255,255,255,0.3);">HODL 80/20</th><th style="padding: 20px; text-align: center; color: white; font-weight: bold; font-size: 18px; border-bottom: 2px solid rgba(255,255,255,0.3);">LP Value</th><th style="padding: 20px; text-align: center; color: white; font-weight: bold; font-size: 18px; border-bottom: 2px solid rgba(255,255,255,0.3);">IL %</th><th style="padding: 20px; text-align: center; color: white; font-weight: bold; font-size: 18px; border-bottom: 2px solid rgba(255,255,255,0.3);">LP vs 100% HODL</th><th style="padding: 20px; text-align: center; color: white; font-weight: bold; font-size: 18px; border-bottom: 2px solid rgba(255,255,255,0.3);">LP vs 80/20 HODL</th></tr></thead><tbody>"""
-        
-        for i, row in enumerate(hodl_data):
-            bg_color = "rgba(255,255,255,0.15)" if i % 2 == 0 else "rgba(255,255,255,0.08)"
-            table_html += f"""<tr style="background: {bg_color};"><td style="padding: 16px; text-align: center; color: white; font-size: 20px; font-weight: bold;">{row[0]}</td><td style="padding: 16px; text-align: center; color: white; font-size: 18px; font-weight: bold;">{row[1]}</td><td style="padding: 16px; text-align: center; color: #4ade80; font-size: 20px; font-weight: bold;">{row[2]}</td><td style="padding: 16px; text-align: center; color: #60a5fa; font-size: 20px; font-weight: bold;">{row[3]}</td><td style="padding: 16px; text-align: center; color: #fbbf24; font-size: 20px; font-weight: bold;">{row[4]}</td><td style="padding: 16px; text-align: center; color: #ffffff; font-size: 20px; font-weight: bold;">-{row[5]}</td><td style="padding: 16px; text-align: center; color: #ffffff; font-size: 20px; font-weight: bold;">-{row[6]}</td><td style="padding: 16px; text-align: center; color: #ffffff; font-size: 20px; font-weight: bold;">-{row[7]}</td></tr>"""
-        
-        table_html += """</tbody></table></div>"""
-        
-        st.markdown(table_html, unsafe_allow_html=True)
-        
-        
+
+        graph = get_page_graph()
+        graph.set("init_price", current_init_price)
+        graph.set("usdc_price", current_usdc_price)
+        st.caption(f"Scenario prices are quoted in USDC (INIT/USDC = {graph.get('init_usdc_price'):.4f}).")
+        tables = graph.get("scenario_tables")
+        with metrics.span("render.tables"):
+            st.markdown(tables.pump_html, unsafe_allow_html=True)
+
+
         st.subheader("📉 Price Drop Scenarios (Decreasing INIT Value)")
-        
-        drop_scenarios = ["-50%", "-75%", "-90%"]
-        drop_multipliers = [0.5, 0.25, 0.1]
-        
-        drop_data = []
-        for scenario, multiplier in zip(drop_scenarios, drop_multipliers):
-            new_price = current_init_price * multiplier
-            il_actual, _ = calculate_impermanent_loss_80_20(current_init_price, 1.0, new_price, 1.0)
-            
-            hodl_100_init = 1000 * multiplier
-            
-            hodl_80_20_init = 800 * multiplier
-            hodl_80_20_usdc = 200
-            hodl_80_20_total = hodl_80_20_init + hodl_80_20_usdc
-            
-            lp_value = hodl_80_20_total * (1 + il_actual/100)
-            
-            difference_100 = lp_value - hodl_100_init
-            difference_80_20 = lp_value - hodl_80_20_total
-            
-            drop_data.append([
-                scenario,
-                f"${new_price:.4f}",
-                f"${hodl_100_init:.0f}",
-                f"${hodl_80_20_total:.0f}",
-                f"${lp_value:.0f}",
-                f"{abs(il_actual):.2f}%",
-                f"${difference_100:+.0f}",
-                f"${difference_80_20:+.0f}"
-            ])
-        
-        table_html_drop = f"""<div style="margin: 20px 0;"><table style="width: 100%; border-collapse: collapse; background: linear-gradient(135deg, #f093fb 0%, #f5576c 100%); border-radius: 15px; overflow: hidden; box-shadow: 0 8px 25px rgba(245, 87, 108, 0.3);"><thead><tr style="background: rgba(0,0,0,0.4);"><th style="padding: 20px; text-align: center; color: white; font-weight: bold; font-size: 18px; border-bottom: 2px solid rgba(255,255,255,0.3);">Scenario</th><th style="padding: 20px; text-align: center; color: white; font-weight: bold; font-size: 18px; border-bottom: 2px solid rgba(255,255,255,0.3);">INIT Price</th><th style="padding: 20px; text-align: center; color: white; font-weight: bold; font-size: 18px; border-bottom: 2px solid rgba(255,255,255,0.3);">HODL 100% INIT</th><th style="padding: 20px; text-align: center; color: white; font-weight: bold; font-size: 18px; border-bottom: 2px solid rgba(255,255,255,0.3);">HODL 80/20</th><th style="padding: 20px; text-align: center; color: white; font-weight: bold; font-size: 18px; border-bottom: 2px solid rgba(255,255,255,0.3);">LP Value</th><th style="padding: 20px; text-align: center; color: white; font-weight: bold; font-size: 18px; border-bottom: 2px solid rgba(255,255,255,0.3);">IL %</th><th style="padding: 20px; text-align: center; color: white; font-weight: bold; font-size: 18px; border-bottom: 2px solid rgba(255,255,255,0.3);">LP vs 100% HODL</th><th style="padding: 20px; text-align: center; color: white; font-weight: bold; font-size: 18px; border-bottom: 2px solid rgba(255,255,255,0.3);">LP vs 80/20 HODL</th></tr></thead><tbody>"""
-        
-        for i, row in enumerate(drop_data):
-            bg_color = "rgba(255,255,255,0.15)" if i % 2 == 0 else "rgba(255,255,255,0.08)"
-            table_html_drop += f"""<tr style="background: {bg_color};"><td style="padding: 16px; text-align: center; color: white; font-size: 20px; font-weight: bold;">{row[0]}</td><td style="padding: 16px; text-align: center; color: white; font-size: 18px; font-weight: bold;">{row[1]}</td><td style="padding: 16px; text-align: center; color: #ffcccc; font-size: 20px; font-weight: bold;">{row[2]}</td><td style="padding: 16px; text-align: center; color: #fbbf24; font-size: 20px; font-weight: bold;">{row[3]}</td><td style="padding: 16px; text-align: center; color: #60a5fa; font-size: 20px; font-weight: bold;">{row[4]}</td><td style="padding: 16px; text-align: center; color: #ffffff; font-size: 20px; font-weight: bold;">-{row[5]}</td><td style="padding: 16px; text-align: center; color: {'#4ade80' if '+' in row[6] else '#ffffff'}; font-size: 20px; font-weight: bold;">{row[6]}</td><td style="padding: 16px; text-align: center; color: {'#4ade80' if '+' in row[7] else '#ffffff'}; font-size: 20px; font-weight: bold;">{row[7]}</td></tr>"""
-        
-        table_html_drop += """</tbody></table></div>"""
-        
-        st.markdown(table_html_drop, unsafe_allow_html=True)
-        
-        
+
+        with metrics.span("render.tables"):
+            st.markdown(tables.drop_html, unsafe_allow_html=True)
+
+
         st.subheader("📊 Complete Scenario Analysis")
-        
+
         # Combine all scenarios for overview
-        all_scenarios = pump_scenarios + drop_scenarios
-        all_multipliers = pump_multipliers + drop_multipliers
-        
-        complete_data = []
-        for scenario, multiplier in zip(all_scenarios, all_multipliers):
-            new_price = current_init_price * multiplier
-            il_actual, pool_value_ratio = calculate_impermanent_loss_80_20(current_init_price, 1.0, new_price, 1.0)
-
-            initial_init_value = 800  # $800 in INIT
-            initial_usdc_value = 200  # $200 in USDC
-            
-
-            hodl_init_value = initial_init_value * multiplier
-            hodl_usdc_value = initial_usdc_value  # USDC stays at $200
-            hodl_total = hodl_init_value + hodl_usdc_value
-            
-            lp_value = hodl_total * (1 + il_actual/100) 
-            
-            difference = hodl_total - lp_value
-            
-            complete_data.append({
-                "Scenario": scenario,
-                "INIT Price": f"${new_price:.4f}",
-                "Price Change": f"{(multiplier-1)*100:+.1f}%",
-                "Impermanent Loss": f"-{abs(il_actual):.2f}%",
-                "HODL Value ($1000)": f"${hodl_total:.2f}",
-                "LP Value ($1000)": f"${lp_value:.2f}",
-                "Difference": f"${difference:+.2f}"
-            })
-        
-        df_complete = pd.DataFrame(complete_data)
-        st.dataframe(df_complete, use_container_width=True)
-        
+        df_complete = graph.get("complete_dataframe")
+        with metrics.span("render.dataframe"):
+            st.dataframe(df_complete, use_container_width=True)
+
     else:
         st.error("❌ Unable to fetch current INIT price. Please check your internet connection.")
 
+@st.fragment
+def render_portfolio():
+    st.header("📁 Portfolio Mode")
+
+    portfolio_file = st.file_uploader(
+        "Upload positions (CSV or JSON lines with asset_a, asset_b, weight_a, entry_price_a, entry_price_b, size)",
+        type=["csv", "jsonl", "json"],
+        key="portfolio_file"
+    )
+
+    if portfolio_file is not None:
+        # Keep the parsed portfolio across reruns so a price change only
+        # recomputes the positions that hold the moved asset.
+        if st.session_state.get("portfolio_file_id") != portfolio_file.file_id:
+            try:
+                st.session_state["portfolio"] = Portfolio.from_file(portfolio_file)
+                st.session_state["portfolio_file_id"] = portfolio_file.file_id
+            except (ValueError, KeyError) as e:
+                st.session_state.pop("portfolio", None)
+                st.session_state.pop("portfolio_file_id", None)
+                st.error(f"❌ Could not load portfolio: {str(e)}")
+
+        portfolio = st.session_state.get("portfolio")
+        if portfolio is not None:
+            try:
+                with metrics.span("portfolio.refresh"):
+                    portfolio.refresh(get_default_service())
+            except Exception as e:
+                st.error(f"Error fetching portfolio prices: {str(e)}")
+
+            summary = portfolio.summary()
+            col1, col2, col3 = st.columns(3)
+
+            with col1:
+                st.markdown(f"""
+                <div class="metric-card">
+                    <h3>💼 LP Value</h3>
+                    <h2>${summary.lp_value:,.2f}</h2>
+                    <p>{summary.priced} / {summary.positions} positions priced</p>
+                </div>
+                """, unsafe_allow_html=True)
+
+            with col2:
+                st.markdown(f"""
+                <div class="metric-card">
+                    <h3>🏦 HODL Value</h3>
+                    <h2>${summary.hodl_value:,.2f}</h2>
+                </div>
+                """, unsafe_allow_html=True)
+
+            with col3:
+                st.markdown(f"""
+                <div class="metric-card">
+                    <h3>📉 Portfolio IL</h3>
+                    <h2>{summary.il_percentage:.2f}%</h2>
+                    <p>${summary.difference:+,.2f} vs HODL</p>
+                </div>
+                """, unsafe_allow_html=True)
+
+            st.subheader("By Pool")
+            st.dataframe(pd.DataFrame(portfolio.by_pool()), use_container_width=True)
+
+            st.subheader("Positions")
+            st.dataframe(pd.DataFrame(portfolio.positions()), use_container_width=True)
+
+def build_grid_file(grid, fmt, entry_price_a):
+    # Called by the download button on click, not on every rerun.
+    target = io.BytesIO()
+    with metrics.span("export.grid"):
+        export_grid(grid, target, fmt=fmt, entry_price_a=entry_price_a, chunk_rows=250_000)
+    return target.getvalue()
+
+def parse_values(text):
+    return [float(value) for value in text.split(",") if value.strip()]
+
+@st.fragment
+def render_grid_export():
+    st.header("📤 Scenario Grid Export")
+    st.markdown("Every combination of the ranges below as numeric columns (IL %, LP / HODL value), for downstream analysis.")
+
+    col1, col2 = st.columns(2)
+    with col1:
+        st.subheader("Asset A multipliers")
+        a_low = st.number_input("From", value=0.1, min_value=0.0001, key="grid_a_low")
+        a_high = st.number_input("To", value=10.0, min_value=0.0001, key="grid_a_high")
+        a_steps = st.number_input("Steps", value=1000, min_value=1, step=100, key="grid_a_steps")
+        a_log = st.checkbox("Log spacing", value=True, key="grid_a_log")
+    with col2:
+        st.subheader("Asset B multipliers")
+        b_low = st.number_input("From", value=1.0, min_value=0.0001, key="grid_b_low")
+        b_high = st.number_input("To", value=1.0, min_value=0.0001, key="grid_b_high")
+        b_steps = st.number_input("Steps", value=1, min_value=1, step=10, key="grid_b_steps")
+        b_log = st.checkbox("Log spacing", value=False, key="grid_b_log")
+
+    col3, col4, col5 = st.columns(3)
+    with col3:
+        weights_text = st.text_input("Asset A weights", value="0.5, 0.8", key="grid_weights")
+    with col4:
+        sizes_text = st.text_input("Position sizes ($)", value="1000", key="grid_sizes")
+    with col5:
+        fmt = st.selectbox("Format", ["parquet", "csv"], key="grid_format")
+    entry_price_a = st.number_input("Asset A entry price ($, adds price columns; 0 to omit)", value=0.0, min_value=0.0, key="grid_entry_a")
+
+    try:
+        grid = make_grid(
+            grid_axis(a_low, a_high, int(a_steps), log=a_log),
+            grid_axis(b_low, b_high, int(b_steps), log=b_log),
+            parse_values(weights_text),
+            parse_values(sizes_text),
+        )
+    except ValueError as e:
+        st.error(f"❌ {str(e)}")
+        return
+
+    rows = grid_rows(grid)
+    too_large = rows > EXPORT_MAX_ROWS
+    st.markdown(f"**{rows:,} scenarios**")
+    if too_large:
+        st.warning(f"⚠️ Downloads are limited to {EXPORT_MAX_ROWS:,} rows. Use `python -m lp8020 export` for larger grids.")
+
+    st.download_button(
+        "⬇️ Download grid",
+        data=lambda: build_grid_file(grid, fmt, entry_price_a or None),
+        file_name=f"il_scenario_grid.{fmt}",
+        mime="application/vnd.apache.parquet" if fmt == "parquet" else "text/csv",
+        disabled=too_large,
+        on_click="ignore",
+        key="grid_download",
+    )
+
+def render_debug_panel():
+    # Only shown with LP8020_METRICS enabled and ?debug=1 in the URL.
+    spans = metrics.SPAN_SECONDS.summary()
+    caches = metrics.CACHE_REQUESTS.values()
+    with st.sidebar.expander("🛠️ Debug: timings & caches", expanded=True):
+        if spans:
+            st.dataframe(pd.DataFrame([
+                {"Stage": stage, "Count": s["count"], "Mean (ms)": s["mean"] * 1000, "Total (ms)": s["sum"] * 1000}
+                for (stage,), s in sorted(spans.items())
+            ]), use_container_width=True, hide_index=True)
+        if caches:
+            st.dataframe(pd.DataFrame([
+                {"Cache": cache, "Result": result, "Count": count}
+                for (cache, result), count in sorted(caches.items())
+            ]), use_container_width=True, hide_index=True)
+        st.code(metrics.REGISTRY.render(), language="text")
+
+if metrics.is_enabled() and os.environ.get("LP8020_METRICS_PORT"):
+    metrics.start_metrics_server()
+
+with metrics.span("rerun"):
+    get_page_graph().set("pool", select_pool_model())
+
+    tab1 = st.tabs(["🪙 Initia/USDC Analysis"])[0]
+
+    with tab1:
+        render_general_calculator()
+    
+        with st.expander("🗺️ Impermanent Loss Surface"):
+            surface_figure = get_page_graph().get("surface_figure")
+            with metrics.span("render.surface"):
+                st.plotly_chart(surface_figure, use_container_width=True)
+    
+        with st.expander("⚖️ Pool Model Comparison"):
+            st.plotly_chart(get_page_graph().get("comparison_figure"), use_container_width=True)
+    
+        render_initia_analysis()
+    
+        render_portfolio()
+
+        render_grid_export()
+
+if metrics.is_enabled() and st.query_params.get("debug") == "1":
+    render_debug_panel()
+
 st.markdown("---")
 st.markdown("""
 <div style="text-align: center; padding: 1rem; color: #888;">
@@ -0,0 +1,57 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+# Minimal stand-in for the CoinGecko simple/price endpoint, used by the
+# benchmarks (and handy for local development: COINGECKO_API_URL=http://127.0.0.1:<port>).
+STUB_PRICES = {
+    "initia": 0.62,
+    "usd-coin": 1.0,
+    "bitcoin": 60000.0,
+    "ethereum": 3000.0,
+}
+
+
+class StubPriceHandler(BaseHTTPRequestHandler):
+    prices = STUB_PRICES
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if not url.path.endswith("/simple/price"):
+            self.send_error(404)
+            return
+        query = parse_qs(url.query)
+        vs_currency = query.get("vs_currencies", ["usd"])[0]
+        body = {
+            asset_id: {vs_currency: self.prices[asset_id], f"{vs_currency}_24h_change": 0.0, "last_updated_at": int(time.time())}
+            for asset_id in query.get("ids", [""])[0].split(",")
+            if asset_id in self.prices
+        }
+        payload = json.dumps(body).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+def start_stub_server(port=0):
+    server = ThreadingHTTPServer(("127.0.0.1", port), StubPriceHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+if __name__ == "__main__":
+    import sys
+
+    server, url = start_stub_server(int(sys.argv[1]) if len(sys.argv) > 1 else 8765)
+    print(f"Serving stub prices on {url}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
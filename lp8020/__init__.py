@@ -0,0 +1,49 @@
+# Submodules are imported on first attribute access so that `import lp8020`
+# (and the CLI) only pay for NumPy, not for requests/pandas/pyarrow.
+import importlib
+
+__version__ = "0.1.0"
+
+_EXPORTS = {
+    "POOL_WEIGHTS": "il_engine",
+    "calculate_impermanent_loss": "il_engine",
+    "calculate_impermanent_loss_80_20": "il_engine",
+    "calculate_impermanent_loss_pair": "il_engine",
+    "normalize_weights": "il_engine",
+    "PriceFeed": "price_feed",
+    "PriceFeedError": "price_feed",
+    "get_default_feed": "price_feed",
+    "Portfolio": "portfolio",
+    "WeightedPool": "pools",
+    "ConcentratedPool": "pools",
+    "DynamicWeightPool": "pools",
+    "compare_impermanent_loss": "pools",
+    "PriceService": "price_service",
+    "get_default_service": "price_service",
+    "run_backtest": "backtest",
+    "summarize_backtest": "backtest",
+    "simulate": "monte_carlo",
+    "risk_report": "monte_carlo",
+    "breakeven_fee_apr": "solver",
+    "breakeven_price_range": "solver",
+    "breakeven_days": "solver",
+    "il_surface": "surface",
+    "downsample_surface": "surface",
+    "make_grid": "export",
+    "export_grid": "export",
+}
+
+__all__ = sorted(_EXPORTS)
+
+
+def __getattr__(name):
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module_name}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
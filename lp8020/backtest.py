@@ -0,0 +1,126 @@
+import os
+from collections import namedtuple
+
+import numpy as np
+
+from .il_engine import calculate_impermanent_loss_pair, normalize_weights
+
+BacktestResult = namedtuple("BacktestResult", ["timestamp", "price_a", "price_b", "lp_value", "hodl_value", "il_percentage"])
+BacktestSummary = namedtuple("BacktestSummary", [
+    "rows", "start", "end", "final_lp_value", "final_hodl_value", "final_il_percentage",
+    "worst_il_percentage", "worst_il_timestamp", "max_lp_value", "min_lp_value",
+])
+
+
+def _timestamps_to_seconds(values):
+    values = np.asarray(values)
+    if np.issubdtype(values.dtype, np.datetime64):
+        return values.astype("datetime64[ns]").astype(np.int64) / 1e9
+    if np.issubdtype(values.dtype, np.number):
+        return values.astype(np.float64, copy=False)
+    import pandas as pd
+    # The resolution of the parsed index depends on the pandas version (ns
+    # before 3.0, us after), so divide by a Timedelta rather than reading asi8.
+    parsed = pd.to_datetime(values, utc=True)
+    return np.asarray((parsed - pd.Timestamp(0, tz="UTC")) / pd.Timedelta(1, "s"), dtype=np.float64)
+
+
+def _iter_csv(path, columns, chunk_rows):
+    import pandas as pd
+    dtypes = {name: np.float64 for name in columns[1:]}
+    for frame in pd.read_csv(path, usecols=columns, dtype=dtypes, chunksize=chunk_rows, engine="c"):
+        yield [frame[name].to_numpy() for name in columns]
+
+
+def _iter_parquet(path, columns, chunk_rows):
+    try:
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise ImportError("Reading Parquet price series requires pyarrow (pip install pyarrow)") from e
+    for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_rows, columns=columns):
+        yield [batch.column(i).to_numpy(zero_copy_only=False) for i in range(len(columns))]
+
+
+def iter_price_chunks(path, price_a="close", price_b=None, timestamp="timestamp", chunk_rows=1_000_000):
+    # Streams (timestamp, price_a, price_b) float64 arrays from a CSV or
+    # Parquet file. Without a `price_b` column asset B is a $1 stablecoin.
+    columns = [timestamp, price_a] + ([price_b] if price_b else [])
+    ext = os.path.splitext(str(path))[1].lower()
+    reader = _iter_parquet if ext in (".parquet", ".pq") else _iter_csv
+
+    for chunk in reader(path, columns, chunk_rows):
+        ts = _timestamps_to_seconds(chunk[0])
+        pa = np.asarray(chunk[1], dtype=np.float64)
+        pb = np.asarray(chunk[2], dtype=np.float64) if price_b else np.ones_like(pa)
+        yield ts, pa, pb
+
+
+def backtest_chunks(chunks, weights=(0.8, 0.2), initial_value=1000.0):
+    # The position is opened at the first row of the series; every later row
+    # is valued against those entry prices, so chunks are independent once
+    # the entry is known.
+    w_a = float(normalize_weights(weights)[0])
+    entry = None
+    for ts, pa, pb in chunks:
+        if len(pa) == 0:
+            continue
+        if entry is None:
+            entry = (pa[0], pb[0])
+        il_percentage, pool_value_ratio = calculate_impermanent_loss_pair(entry[0], entry[1], pa, pb, w_a=w_a)
+        lp_value = initial_value * pool_value_ratio
+        hodl_value = initial_value * (w_a * (pa / entry[0]) + (1 - w_a) * (pb / entry[1]))
+        yield BacktestResult(ts, pa, pb, lp_value, hodl_value, il_percentage)
+
+
+def run_backtest(path, weights=(0.8, 0.2), initial_value=1000.0, every=1, **read_kwargs):
+    # Materialises the full LP vs HODL path. `every` keeps one row in N, which
+    # is what charts want for multi-year minute data.
+    parts = []
+    offset = 0
+    for result in backtest_chunks(iter_price_chunks(path, **read_kwargs), weights, initial_value):
+        if every > 1:
+            # Keep the stride going across chunk boundaries.
+            n = len(result.timestamp)
+            result = BacktestResult(*(column[offset::every] for column in result))
+            offset = (offset - n) % every
+        parts.append(result)
+    if not parts:
+        empty = np.empty(0, dtype=np.float64)
+        return BacktestResult(*([empty] * len(BacktestResult._fields)))
+    return BacktestResult(*(np.concatenate(columns) for columns in zip(*parts)))
+
+
+def summarize_backtest(path, weights=(0.8, 0.2), initial_value=1000.0, **read_kwargs):
+    # Streaming reduction: memory stays bounded by one chunk regardless of the
+    # length of the series.
+    rows = 0
+    start = end = None
+    worst_il, worst_ts = np.inf, None
+    max_lp, min_lp = -np.inf, np.inf
+    last = None
+    for result in backtest_chunks(iter_price_chunks(path, **read_kwargs), weights, initial_value):
+        if start is None:
+            start = result.timestamp[0]
+        rows += len(result.timestamp)
+        end = result.timestamp[-1]
+        i = int(np.argmin(result.il_percentage))
+        if result.il_percentage[i] < worst_il:
+            worst_il, worst_ts = float(result.il_percentage[i]), float(result.timestamp[i])
+        max_lp = max(max_lp, float(result.lp_value.max()))
+        min_lp = min(min_lp, float(result.lp_value.min()))
+        last = result
+
+    if last is None:
+        raise ValueError(f"No price rows found in {path}")
+    return BacktestSummary(
+        rows=rows,
+        start=float(start),
+        end=float(end),
+        final_lp_value=float(last.lp_value[-1]),
+        final_hodl_value=float(last.hodl_value[-1]),
+        final_il_percentage=float(last.il_percentage[-1]),
+        worst_il_percentage=worst_il,
+        worst_il_timestamp=worst_ts,
+        max_lp_value=max_lp,
+        min_lp_value=min_lp,
+    )
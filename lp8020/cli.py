@@ -0,0 +1,197 @@
+import argparse
+import csv
+import io
+import json
+import sys
+
+PRICE_COLUMNS = ("p0_a", "p0_b", "p1_a", "p1_b")
+RESULT_COLUMNS = ("il_percentage", "pool_value_ratio")
+
+
+def _open_input(path):
+    if path in (None, "-"):
+        return io.TextIOWrapper(sys.stdin.buffer, encoding="utf-8", newline="")
+    return open(path, "r", encoding="utf-8", newline="")
+
+
+def _open_output(path):
+    if path in (None, "-"):
+        return io.TextIOWrapper(sys.stdout.buffer, encoding="utf-8", newline="", write_through=True)
+    return open(path, "w", encoding="utf-8", newline="")
+
+
+def _detect_format(path, explicit):
+    if explicit:
+        return explicit
+    if path and path.endswith((".jsonl", ".ndjson", ".json")):
+        return "jsonl"
+    return "csv"
+
+
+def _iter_records(stream, fmt):
+    if fmt == "csv":
+        yield from csv.DictReader(stream)
+    else:
+        for line in stream:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+
+
+def _iter_chunks(records, size):
+    chunk = []
+    for record in records:
+        chunk.append(record)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def evaluate_records(records, weight_a=0.8):
+    # Scores a list of scenario dicts in one vectorized call. Missing asset B
+    # prices default to 1.0 (a stablecoin leg); a `w_a` field overrides the
+    # default asset A weight per row.
+    import numpy as np
+
+    from .il_engine import calculate_impermanent_loss_pair
+
+    def column(name, default=None):
+        values = [record.get(name, default) for record in records]
+        values = [default if value in (None, "") else value for value in values]
+        if any(value is None for value in values):
+            raise ValueError(f"Missing required column: {name}")
+        return np.asarray(values, dtype=np.float64)
+
+    il_percentage, pool_value_ratio = calculate_impermanent_loss_pair(
+        column("p0_a"), column("p0_b", 1.0), column("p1_a"), column("p1_b", 1.0), w_a=column("w_a", weight_a),
+    )
+    return il_percentage, pool_value_ratio
+
+
+def cmd_evaluate(args):
+    in_fmt = _detect_format(args.input, args.input_format)
+    out_fmt = args.format
+    source = _open_input(args.input)
+    sink = _open_output(args.output)
+    writer = None
+    rows = 0
+    try:
+        for chunk in _iter_chunks(_iter_records(source, in_fmt), args.chunk_rows):
+            il_percentage, pool_value_ratio = evaluate_records(chunk, weight_a=args.weight_a)
+            if out_fmt == "csv":
+                if writer is None:
+                    fieldnames = list(chunk[0].keys()) + [c for c in RESULT_COLUMNS if c not in chunk[0]]
+                    writer = csv.DictWriter(sink, fieldnames=fieldnames, extrasaction="ignore")
+                    writer.writeheader()
+                for record, il, ratio in zip(chunk, il_percentage.tolist(), pool_value_ratio.tolist()):
+                    record["il_percentage"] = f"{il:.{args.precision}f}"
+                    record["pool_value_ratio"] = f"{ratio:.{args.precision}f}"
+                    writer.writerow(record)
+            else:
+                for record, il, ratio in zip(chunk, il_percentage.tolist(), pool_value_ratio.tolist()):
+                    record["il_percentage"] = round(il, args.precision)
+                    record["pool_value_ratio"] = round(ratio, args.precision)
+                    sink.write(json.dumps(record) + "\n")
+            rows += len(chunk)
+    finally:
+        sink.flush()
+        if args.output not in (None, "-"):
+            sink.close()
+        if args.input not in (None, "-"):
+            source.close()
+    if args.verbose:
+        print(f"Evaluated {rows} scenarios", file=sys.stderr)
+    return 0
+
+
+def parse_axis(spec):
+    # "low:high:steps" (append ":log" for geometric spacing) or "a,b,c".
+    from .export import grid_axis
+
+    parts = spec.split(":")
+    if len(parts) in (3, 4):
+        if len(parts) == 4 and parts[3] != "log":
+            raise ValueError(f"Invalid axis spacing {parts[3]!r} (only 'log' is supported)")
+        return grid_axis(float(parts[0]), float(parts[1]), int(parts[2]), log=len(parts) == 4)
+    return [float(value) for value in spec.split(",") if value.strip()]
+
+
+def cmd_export(args):
+    from .export import detect_format, grid_columns, grid_rows, iter_grid_chunks, make_grid, write_grid_csv, write_grid_parquet
+
+    grid = make_grid(parse_axis(args.mult_a), parse_axis(args.mult_b), parse_axis(args.weights), parse_axis(args.sizes))
+    fmt = detect_format(args.output, args.format)
+    columns = grid_columns(args.entry_price_a)
+    chunks = iter_grid_chunks(grid, args.chunk_rows, args.entry_price_a, args.entry_price_b)
+    if fmt == "parquet":
+        if args.output in (None, "-"):
+            raise ValueError("Parquet output needs a file path (-o)")
+        rows = write_grid_parquet(chunks, args.output, columns)
+    else:
+        sink = _open_output(args.output)
+        try:
+            rows = write_grid_csv(chunks, sink, columns, args.precision)
+        finally:
+            sink.flush()
+            if args.output not in (None, "-"):
+                sink.close()
+    if args.verbose:
+        print(f"Exported {rows} of {grid_rows(grid)} scenarios", file=sys.stderr)
+    return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="lp8020", description="Headless impermanent loss tools for weighted LP pools.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    evaluate = subparsers.add_parser(
+        "evaluate",
+        help="Score IL for a scenario file or stdin stream",
+        description="Reads scenarios with p0_a, p1_a and optional p0_b, p1_b, w_a columns (CSV or JSON lines) "
+                    "and appends il_percentage and pool_value_ratio.",
+    )
+    evaluate.add_argument("input", nargs="?", default="-", help="Scenario file, or '-' for stdin (default)")
+    evaluate.add_argument("-o", "--output", default="-", help="Output file, or '-' for stdout (default)")
+    evaluate.add_argument("--input-format", choices=("csv", "jsonl"), help="Input format (default: from extension, else csv)")
+    evaluate.add_argument("-f", "--format", choices=("csv", "jsonl"), default="csv", help="Output format (default: csv)")
+    evaluate.add_argument("--weight-a", type=float, default=0.8, help="Asset A weight when the input has no w_a column")
+    evaluate.add_argument("--chunk-rows", type=int, default=50_000, help="Rows scored per vectorized batch")
+    evaluate.add_argument("--precision", type=int, default=6, help="Decimal places in the output")
+    evaluate.add_argument("-v", "--verbose", action="store_true")
+    evaluate.set_defaults(func=cmd_evaluate)
+
+    export = subparsers.add_parser(
+        "export",
+        help="Write a scenario grid to CSV or Parquet",
+        description="Generates every combination of the given axes and writes numeric IL, LP and HODL columns "
+                    "in chunks. Axes are 'low:high:steps', 'low:high:steps:log' or a comma-separated list.",
+    )
+    export.add_argument("-o", "--output", default="-", help="Output file, or '-' for stdout (CSV only, default)")
+    export.add_argument("-f", "--format", choices=("csv", "parquet"), help="Output format (default: from extension, else csv)")
+    export.add_argument("--mult-a", required=True, help="Asset A price multipliers, e.g. 0.1:10:1000:log")
+    export.add_argument("--mult-b", default="1", help="Asset B price multipliers (default: 1)")
+    export.add_argument("--weights", default="0.8", help="Asset A weights (default: 0.8)")
+    export.add_argument("--sizes", default="1000", help="Position sizes (default: 1000)")
+    export.add_argument("--entry-price-a", type=float, help="Adds price_a/price_b columns relative to these entry prices")
+    export.add_argument("--entry-price-b", type=float, default=1.0, help="Asset B entry price (default: 1.0)")
+    export.add_argument("--chunk-rows", type=int, default=1_000_000, help="Rows generated and written per batch")
+    export.add_argument("--precision", type=int, default=6, help="Significant digits in CSV output")
+    export.add_argument("-v", "--verbose", action="store_true")
+    export.set_defaults(func=cmd_export)
+
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    try:
+        return args.func(args)
+    except BrokenPipeError:
+        return 0
+    except (ValueError, KeyError, OSError, ImportError) as e:
+        # Bad input, unreadable/unwritable files and missing optional
+        # dependencies (pyarrow) are user errors, not tracebacks.
+        print(f"lp8020: error: {e}", file=sys.stderr)
+        return 2
@@ -0,0 +1,128 @@
+import io
+import os
+from collections import namedtuple
+
+import numpy as np
+
+from .il_engine import calculate_impermanent_loss_pair
+
+# Cartesian product of the four axes, enumerated in C order (size varies
+# fastest). Rows are never materialised as a whole: each chunk turns a range
+# of flat row indices back into axis indices.
+ScenarioGrid = namedtuple("ScenarioGrid", ["mult_a", "mult_b", "weight_a", "size"])
+
+GRID_COLUMNS = (
+    "mult_a", "mult_b", "weight_a", "size",
+    "il_percentage", "pool_value_ratio", "lp_value", "hodl_value", "difference",
+)
+PRICE_COLUMNS = ("price_a", "price_b")
+
+
+def grid_axis(low, high, steps, log=False):
+    if steps < 1:
+        raise ValueError("An axis needs at least one step")
+    if log:
+        if low <= 0 or high <= 0:
+            raise ValueError("Log-spaced axes need positive bounds")
+        return np.geomspace(low, high, steps)
+    return np.linspace(low, high, steps)
+
+
+def make_grid(mult_a, mult_b=(1.0,), weight_a=(0.8,), size=(1000.0,)):
+    grid = ScenarioGrid(*(np.atleast_1d(np.asarray(axis, dtype=np.float64)) for axis in (mult_a, mult_b, weight_a, size)))
+    if any(axis.ndim != 1 or len(axis) == 0 for axis in grid):
+        raise ValueError("Every grid axis must be a non-empty 1-D sequence")
+    if np.any(grid.mult_a <= 0) or np.any(grid.mult_b <= 0):
+        raise ValueError("Price multipliers must be positive")
+    if np.any((grid.weight_a <= 0) | (grid.weight_a >= 1)):
+        raise ValueError("weight_a must be between 0 and 1 (exclusive)")
+    return grid
+
+
+def grid_rows(grid):
+    return int(np.prod([len(axis) for axis in grid], dtype=np.int64))
+
+
+def grid_columns(entry_price_a=None):
+    return GRID_COLUMNS + (PRICE_COLUMNS if entry_price_a is not None else ())
+
+
+def iter_grid_chunks(grid, chunk_rows=1_000_000, entry_price_a=None, entry_price_b=1.0):
+    # Yields {column: float64 array} batches of at most `chunk_rows` rows, in
+    # grid_columns() order. Memory is bounded by the chunk size, not the grid.
+    shape = tuple(len(axis) for axis in grid)
+    rows = grid_rows(grid)
+    for start in range(0, rows, chunk_rows):
+        index = np.unravel_index(np.arange(start, min(start + chunk_rows, rows), dtype=np.int64), shape)
+        mult_a, mult_b, w_a, size = (axis[i] for axis, i in zip(grid, index))
+
+        il_percentage, pool_value_ratio = calculate_impermanent_loss_pair(1.0, 1.0, mult_a, mult_b, w_a=w_a)
+        lp_value = size * pool_value_ratio
+        hodl_value = size * (w_a * mult_a + (1 - w_a) * mult_b)
+        chunk = {
+            "mult_a": mult_a,
+            "mult_b": mult_b,
+            "weight_a": w_a,
+            "size": size,
+            "il_percentage": il_percentage,
+            "pool_value_ratio": pool_value_ratio,
+            "lp_value": lp_value,
+            "hodl_value": hodl_value,
+            "difference": lp_value - hodl_value,
+        }
+        if entry_price_a is not None:
+            chunk["price_a"] = entry_price_a * mult_a
+            chunk["price_b"] = entry_price_b * mult_b
+        yield chunk
+
+
+def write_grid_csv(chunks, sink, columns, precision=6):
+    # `sink` is a text stream; each chunk is formatted and written on its own.
+    sink.write(",".join(columns) + "\n")
+    fmt = f"%.{precision}g"
+    rows = 0
+    for chunk in chunks:
+        np.savetxt(sink, np.column_stack([chunk[name] for name in columns]), fmt=fmt, delimiter=",")
+        rows += len(chunk[columns[0]])
+    return rows
+
+
+def write_grid_parquet(chunks, target, columns, compression="zstd"):
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise ImportError("Writing Parquet scenario grids requires pyarrow (pip install pyarrow)") from e
+    schema = pa.schema([(name, pa.float64()) for name in columns])
+    rows = 0
+    # One row group per chunk, so the writer never buffers more than that.
+    with pq.ParquetWriter(target, schema, compression=compression) as writer:
+        for chunk in chunks:
+            writer.write_batch(pa.record_batch([chunk[name] for name in columns], schema=schema))
+            rows += len(chunk[columns[0]])
+    return rows
+
+
+def detect_format(path, explicit=None):
+    if explicit:
+        return explicit
+    return "parquet" if os.path.splitext(str(path))[1].lower() in (".parquet", ".pq") else "csv"
+
+
+def export_grid(grid, target, fmt=None, chunk_rows=1_000_000, entry_price_a=None, entry_price_b=1.0, precision=6):
+    # Writes the whole grid to `target`, a path or a binary file object (CSV
+    # or Parquet), and returns the number of rows written.
+    columns = grid_columns(entry_price_a)
+    chunks = iter_grid_chunks(grid, chunk_rows, entry_price_a, entry_price_b)
+    is_file = hasattr(target, "write")
+    if detect_format("" if is_file else target, fmt) == "parquet":
+        return write_grid_parquet(chunks, target, columns)
+    if is_file:
+        sink = io.TextIOWrapper(target, encoding="utf-8", newline="")
+        try:
+            return write_grid_csv(chunks, sink, columns, precision)
+        finally:
+            sink.flush()
+            sink.detach()
+    with open(target, "w", encoding="utf-8", newline="") as sink:
+        return write_grid_csv(chunks, sink, columns, precision)
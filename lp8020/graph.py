@@ -0,0 +1,87 @@
+from . import metrics
+
+_MISSING = object()
+
+
+def _same(a, b):
+    if a is b:
+        return True
+    try:
+        return bool(a == b)
+    except (TypeError, ValueError):
+        # numpy arrays and friends: fall back to identity.
+        return False
+
+
+class _Node:
+    __slots__ = ("name", "fn", "deps", "value", "version", "seen", "computes")
+
+    def __init__(self, name, fn=None, deps=()):
+        self.name = name
+        self.fn = fn
+        self.deps = tuple(deps)
+        self.value = _MISSING
+        self.version = 0
+        self.seen = None
+        self.computes = 0
+
+
+class Graph:
+    # Small pull-based computation graph. Inputs are set explicitly; derived
+    # nodes are memoized on the versions of their dependencies and recompute
+    # lazily, only when something upstream actually changed. A node whose new
+    # value equals the old one keeps its version, which stops the change from
+    # propagating any further (early cutoff).
+
+    def __init__(self):
+        self._nodes = {}
+
+    def input(self, name, value=_MISSING):
+        self._nodes[name] = _Node(name)
+        if value is not _MISSING:
+            self.set(name, value)
+        return self
+
+    def node(self, name, deps=()):
+        def register(fn):
+            for dep in deps:
+                if dep not in self._nodes:
+                    raise KeyError(f"Unknown dependency {dep!r} for node {name!r}")
+            self._nodes[name] = _Node(name, fn, deps)
+            return fn
+        return register
+
+    def set(self, name, value):
+        node = self._nodes[name]
+        if node.fn is not None:
+            raise ValueError(f"{name!r} is a derived node and cannot be set")
+        if node.value is _MISSING or not _same(node.value, value):
+            node.value = value
+            node.version += 1
+            return True
+        return False
+
+    def get(self, name):
+        node = self._nodes[name]
+        if node.fn is None:
+            if node.value is _MISSING:
+                raise KeyError(f"Input {name!r} has not been set")
+            return node.value
+
+        values = [self.get(dep) for dep in node.deps]
+        versions = tuple(self._nodes[dep].version for dep in node.deps)
+        if node.seen != versions:
+            metrics.cache_result("graph", "miss")
+            with metrics.span(f"graph.{name}"):
+                value = node.fn(*values)
+            node.computes += 1
+            node.seen = versions
+            if node.value is _MISSING or not _same(node.value, value):
+                node.value = value
+                node.version += 1
+        else:
+            metrics.cache_result("graph", "hit")
+        return node.value
+
+    def stats(self):
+        return {name: node.computes for name, node in self._nodes.items() if node.fn is not None}
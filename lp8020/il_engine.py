@@ -0,0 +1,65 @@
+import numpy as np
+
+POOL_WEIGHTS = {
+    "50/50": (0.5, 0.5),
+    "80/20": (0.8, 0.2),
+    "95/5": (0.95, 0.05),
+}
+
+_SCALARS = (float, int)
+
+
+def normalize_weights(weights):
+    w = np.asarray(weights, dtype=np.float64)
+    if w.ndim == 0 or w.shape[-1] < 2:
+        raise ValueError("A weighted pool needs at least two asset weights")
+    if np.any(w <= 0):
+        raise ValueError("Pool weights must be strictly positive")
+    return w / w.sum(axis=-1, keepdims=True)
+
+
+def calculate_impermanent_loss(p0, p1, weights):
+    # p0 / p1 / weights broadcast against each other; the last axis indexes
+    # the assets of the pool, everything before it is the batch shape.
+    w = normalize_weights(weights)
+    price_change = np.asarray(p1, dtype=np.float64) / np.asarray(p0, dtype=np.float64)
+
+    pool_value_ratio = np.exp(np.sum(w * np.log(price_change), axis=-1))
+    hold_value_ratio = np.sum(w * price_change, axis=-1)
+
+    il_percentage = (pool_value_ratio / hold_value_ratio - 1) * 100
+    return il_percentage, pool_value_ratio
+
+
+def calculate_impermanent_loss_pair(p0_a, p0_b, p1_a, p1_b, w_a=0.8):
+    # Two-asset fast path: avoids stacking the inputs into an (..., 2) array,
+    # which matters when sweeping millions of price pairs.
+    w_a = np.asarray(w_a, dtype=np.float64)
+    if np.any((w_a <= 0) | (w_a >= 1)):
+        raise ValueError("w_a must be between 0 and 1 (exclusive)")
+    w_b = 1.0 - w_a
+
+    price_change_a = np.asarray(p1_a, dtype=np.float64) / p0_a
+    price_change_b = np.asarray(p1_b, dtype=np.float64) / p0_b
+
+    pool_value_ratio = (price_change_a ** w_a) * (price_change_b ** w_b)
+    hold_value_ratio = (price_change_a * w_a) + (price_change_b * w_b)
+
+    il_percentage = (pool_value_ratio / hold_value_ratio - 1) * 100
+    return il_percentage, pool_value_ratio
+
+
+def calculate_impermanent_loss_80_20(p0_a, p0_b, p1_a, p1_b):
+    # Plain-float fast path: the array engine's conversions and checks cost
+    # ~50x the arithmetic itself for a single price pair.
+    if type(p0_a) in _SCALARS and type(p0_b) in _SCALARS and type(p1_a) in _SCALARS and type(p1_b) in _SCALARS:
+        if p0_a > 0 and p0_b > 0 and p1_a > 0 and p1_b > 0:
+            price_change_a = p1_a / p0_a
+            price_change_b = p1_b / p0_b
+            pool_value_ratio = (price_change_a ** 0.8) * (price_change_b ** 0.2)
+            hold_value_ratio = (price_change_a * 0.8) + (price_change_b * 0.2)
+            return (pool_value_ratio / hold_value_ratio - 1) * 100, pool_value_ratio
+    il_percentage, pool_value_ratio = calculate_impermanent_loss_pair(p0_a, p0_b, p1_a, p1_b, w_a=0.8)
+    if np.ndim(il_percentage) == 0:
+        return float(il_percentage), float(pool_value_ratio)
+    return il_percentage, pool_value_ratio
@@ -0,0 +1,251 @@
+import logging
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import nullcontext
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Instrumentation is off unless LP8020_METRICS is set (or enable() is called).
+# Every helper checks this flag first, so disabled metrics cost one global
+# lookup per call site.
+_enabled = os.environ.get("LP8020_METRICS", "").lower() not in ("", "0", "false", "no")
+_NOOP = nullcontext()
+
+logger = logging.getLogger(__name__)
+
+
+def is_enabled():
+    return _enabled
+
+
+def enable():
+    global _enabled
+    _enabled = True
+
+
+def disable():
+    global _enabled
+    _enabled = False
+
+
+def _format_labels(names, values):
+    if not names:
+        return ""
+    return "{" + ",".join(f'{n}="{str(v)}"' for n, v in zip(names, values)) + "}"
+
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name, help, labels=()):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, *label_values):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def samples(self):
+        with self._lock:
+            return [(self.name, _format_labels(self.labels, key), value) for key, value in sorted(self._values.items())]
+
+    def values(self):
+        with self._lock:
+            return dict(self._values)
+
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, name, help, labels=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, *label_values):
+        i = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][i] += 1
+            series[1] += value
+            series[2] += 1
+
+    def samples(self):
+        lines = []
+        with self._lock:
+            items = sorted((key, (list(s[0]), s[1], s[2])) for key, s in self._series.items())
+        for key, (counts, total, count) in items:
+            cumulative = 0
+            for bound, n in zip(self.buckets + (float("inf"),), counts):
+                cumulative += n
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append((f"{self.name}_bucket", _format_labels(self.labels + ("le",), key + (le,)), cumulative))
+            lines.append((f"{self.name}_sum", _format_labels(self.labels, key), total))
+            lines.append((f"{self.name}_count", _format_labels(self.labels, key), count))
+        return lines
+
+    def summary(self):
+        with self._lock:
+            return {key: {"count": s[2], "sum": s[1], "mean": s[1] / s[2] if s[2] else 0.0} for key, s in self._series.items()}
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = {}
+        self._collectors = []
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, cls, name, *args, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, *args, **kwargs)
+            return metric
+
+    def counter(self, name, help, labels=()):
+        return self._get_or_create(Counter, name, help, labels)
+
+    def histogram(self, name, help, labels=(), buckets=DEFAULT_BUCKETS):
+        return self._get_or_create(Histogram, name, help, labels, buckets)
+
+    def register_collector(self, collector):
+        # `collector()` returns [(name, kind, help, [(labels_dict, value), ...])]
+        # and is only called at scrape time, for values that are cheaper to
+        # read on demand (e.g. lru_cache statistics).
+        with self._lock:
+            self._collectors.append(collector)
+
+    def render(self):
+        lines = []
+        with self._lock:
+            metrics = list(self._metrics.values())
+            collectors = list(self._collectors)
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(f"{name}{labels} {value}" for name, labels, value in metric.samples())
+        # Several collectors may report the same family; each family must
+        # appear once in the exposition format.
+        families = {}
+        for collector in collectors:
+            for name, kind, help, samples in collector():
+                families.setdefault(name, (kind, help, []))[2].extend(samples)
+        for name, (kind, help, samples) in families.items():
+            lines.append(f"# HELP {name} {help}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in samples:
+                lines.append(f"{name}{_format_labels(tuple(labels), tuple(labels.values()))} {value}")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+SPAN_SECONDS = REGISTRY.histogram("lp8020_span_seconds", "Time spent in instrumented stages", labels=("stage",))
+CACHE_REQUESTS = REGISTRY.counter("lp8020_cache_requests_total", "Cache lookups by cache and result", labels=("cache", "result"))
+UPSTREAM_SECONDS = REGISTRY.histogram("lp8020_upstream_request_seconds", "Upstream price API latency", labels=("status",))
+UPSTREAM_ERRORS = REGISTRY.counter("lp8020_upstream_errors_total", "Failed upstream price API requests", labels=("reason",))
+
+
+class _Span:
+    __slots__ = ("stage", "start")
+
+    def __init__(self, stage):
+        self.stage = stage
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        SPAN_SECONDS.observe(time.perf_counter() - self.start, self.stage)
+        return False
+
+
+def span(stage):
+    if not _enabled:
+        return _NOOP
+    return _Span(stage)
+
+
+def cache_result(cache, result, count=1):
+    if _enabled:
+        CACHE_REQUESTS.inc(count, cache, result)
+
+
+def upstream_request(seconds, status):
+    if _enabled:
+        UPSTREAM_SECONDS.observe(seconds, str(status))
+
+
+def upstream_error(reason):
+    if _enabled:
+        UPSTREAM_ERRORS.inc(1, reason)
+
+
+def lru_cache_collector(**caches):
+    # Exposes hit/miss/size of functools.lru_cache functions at scrape time.
+    def collect():
+        hits, misses, sizes = [], [], []
+        for name, fn in caches.items():
+            info = fn.cache_info()
+            hits.append(({"cache": name}, info.hits))
+            misses.append(({"cache": name}, info.misses))
+            sizes.append(({"cache": name}, info.currsize))
+        return [
+            ("lp8020_lru_hits_total", "counter", "lru_cache hits", hits),
+            ("lp8020_lru_misses_total", "counter", "lru_cache misses", misses),
+            ("lp8020_lru_entries", "gauge", "lru_cache entries", sizes),
+        ]
+    return collect
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    registry = REGISTRY
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        if self.path.split("?")[0] not in ("/metrics", "/"):
+            self.send_error(404)
+            return
+        payload = self.registry.render().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+_server = None
+_server_failed = False
+_server_lock = threading.Lock()
+
+
+def start_metrics_server(port=None, host="0.0.0.0"):
+    # Starts (once per process) a Prometheus text endpoint on /metrics.
+    # Returns None if the port cannot be bound; the failure is logged once
+    # and not retried, since the app calls this on every rerun.
+    global _server, _server_failed
+    with _server_lock:
+        if _server is None and not _server_failed:
+            port = int(port if port is not None else os.environ.get("LP8020_METRICS_PORT", 9108))
+            try:
+                _server = ThreadingHTTPServer((host, port), _MetricsHandler)
+            except OSError as e:
+                _server_failed = True
+                logger.warning("Could not start the metrics server on %s:%s: %s", host, port, e)
+                return None
+            threading.Thread(target=_server.serve_forever, name="metrics-server", daemon=True).start()
+        return _server
@@ -0,0 +1,113 @@
+import os
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from .il_engine import calculate_impermanent_loss_pair, normalize_weights
+
+SimulationResult = namedtuple("SimulationResult", ["il_percentage", "lp_vs_hodl", "paths"])
+RiskReport = namedtuple("RiskReport", [
+    "paths", "percentiles", "il_percentiles", "lp_vs_hodl_percentiles",
+    "mean_il_percentage", "var", "cvar", "confidence",
+])
+
+DEFAULT_PERCENTILES = (1, 5, 25, 50, 75, 95, 99)
+DEFAULT_CHUNK_PATHS = 250_000
+
+
+def _gbm_price_changes(rng, n, horizon, mu, sigma, correlation):
+    # Only the terminal distribution matters at a fixed horizon, so GBM is
+    # sampled exactly in one step instead of walking every path.
+    mu = np.asarray(mu, dtype=np.float64)
+    sigma = np.asarray(sigma, dtype=np.float64)
+    z = rng.standard_normal((n, 2))
+    z[:, 1] = correlation * z[:, 0] + np.sqrt(1 - correlation ** 2) * z[:, 1]
+    log_change = (mu - 0.5 * sigma ** 2) * horizon + sigma * np.sqrt(horizon) * z
+    return np.exp(log_change)
+
+
+def _bootstrap_price_changes(rng, n, horizon, log_returns):
+    # Resamples whole rows of historical (asset A, asset B) log returns so the
+    # cross-asset dependence is kept; `horizon` is a number of return periods.
+    steps = int(horizon)
+    total = np.zeros((n, 2))
+    # Accumulate step by step to keep memory at O(chunk) rather than O(chunk * steps).
+    for _ in range(steps):
+        total += log_returns[rng.integers(0, len(log_returns), size=n)]
+    return np.exp(total)
+
+
+def _simulate_chunk(args):
+    seed, n, model, params, w_a = args
+    rng = np.random.default_rng(seed)
+    if model == "gbm":
+        changes = _gbm_price_changes(rng, n, **params)
+    elif model == "bootstrap":
+        changes = _bootstrap_price_changes(rng, n, **params)
+    else:
+        raise ValueError(f"Unknown price model: {model}")
+
+    il_percentage, pool_value_ratio = calculate_impermanent_loss_pair(1.0, 1.0, changes[:, 0], changes[:, 1], w_a=w_a)
+    hold_value_ratio = w_a * changes[:, 0] + (1 - w_a) * changes[:, 1]
+    lp_vs_hodl = (pool_value_ratio - hold_value_ratio) * 100
+    return il_percentage.astype(np.float32), lp_vs_hodl.astype(np.float32)
+
+
+def simulate(paths, model="gbm", weights=(0.8, 0.2), seed=0, chunk_paths=DEFAULT_CHUNK_PATHS, workers=None, **params):
+    # Paths are split into fixed-size chunks, each with its own child seed
+    # spawned from `seed`. Results therefore depend only on (seed, chunk_paths),
+    # never on the number of workers or the order chunks finish in.
+    #
+    # model="gbm":       horizon (years), mu=(mu_a, mu_b), sigma=(sigma_a, sigma_b), correlation
+    # model="bootstrap": horizon (periods), log_returns=(n, 2) array of historical log returns
+    if paths <= 0:
+        raise ValueError("paths must be a positive number of simulations")
+    if chunk_paths <= 0:
+        raise ValueError("chunk_paths must be positive")
+    w_a = float(normalize_weights(weights)[0])
+    if model == "gbm":
+        params = {"horizon": 1.0, "mu": (0.0, 0.0), "sigma": (0.8, 0.01), "correlation": 0.0, **params}
+    elif model == "bootstrap":
+        params = {"horizon": 1, **params}
+        params["log_returns"] = np.asarray(params["log_returns"], dtype=np.float64).reshape(-1, 2)
+    else:
+        raise ValueError(f"Unknown price model: {model}")
+
+    sizes = [chunk_paths] * (paths // chunk_paths)
+    if paths % chunk_paths:
+        sizes.append(paths % chunk_paths)
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    tasks = [(child, size, model, params, w_a) for child, size in zip(seeds, sizes)]
+
+    if workers is None:
+        workers = min(os.cpu_count() or 1, len(tasks))
+    if workers <= 1 or len(tasks) <= 1:
+        results = list(map(_simulate_chunk, tasks))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_simulate_chunk, tasks))
+
+    il_percentage = np.concatenate([r[0] for r in results])
+    lp_vs_hodl = np.concatenate([r[1] for r in results])
+    return SimulationResult(il_percentage, lp_vs_hodl, paths)
+
+
+def risk_report(result, percentiles=DEFAULT_PERCENTILES, confidence=0.95):
+    # VaR / CVaR are expressed as a loss (positive number, % of the initial
+    # position) of the LP relative to holding the same starting basket.
+    outcomes = result.lp_vs_hodl.astype(np.float64)
+    if len(outcomes) == 0:
+        raise ValueError("Cannot build a risk report from an empty simulation")
+    cutoff = np.percentile(outcomes, (1 - confidence) * 100)
+    tail = outcomes[outcomes <= cutoff]
+    return RiskReport(
+        paths=result.paths,
+        percentiles=tuple(percentiles),
+        il_percentiles=np.percentile(result.il_percentage, percentiles),
+        lp_vs_hodl_percentiles=np.percentile(outcomes, percentiles),
+        mean_il_percentage=float(result.il_percentage.mean(dtype=np.float64)),
+        var=float(-cutoff),
+        cvar=float(-tail.mean()) if len(tail) else float(-cutoff),
+        confidence=confidence,
+    )
@@ -0,0 +1,177 @@
+from collections import namedtuple
+
+import numpy as np
+
+from .il_engine import calculate_impermanent_loss_pair
+
+# Pool models for a two-asset position, all priced relative to entry: inputs
+# are price multipliers of asset A and asset B (new / entry price), outputs
+# are ratios to the initial position value. Every model provides
+#
+#     value_ratio(mult_a, mult_b)        LP value / initial value
+#     hodl_ratio(mult_a, mult_b)         value of holding the deposit / initial value
+#     impermanent_loss(mult_a, mult_b)   (il_percentage, value_ratio)
+#     weight_a                           share of the deposit held in asset A
+#     label                              short display name
+#
+# and broadcasts over array arguments. Models are namedtuples, so they are
+# immutable and hashable and can key the table and surface caches.
+
+
+def _impermanent_loss(pool, mult_a, mult_b):
+    value_ratio = pool.value_ratio(mult_a, mult_b)
+    il_percentage = (value_ratio / pool.hodl_ratio(mult_a, mult_b) - 1) * 100
+    return il_percentage, value_ratio
+
+
+def _hodl_ratio(weight_a, mult_a, mult_b):
+    return weight_a * np.asarray(mult_a, dtype=np.float64) + (1 - weight_a) * np.asarray(mult_b, dtype=np.float64)
+
+
+class WeightedPool(namedtuple("WeightedPool", ["w_a"])):
+    # Constant-weight constant-product pool (Balancer-style; 50/50 is Uniswap v2).
+
+    __slots__ = ()
+
+    def __new__(cls, w_a=0.8):
+        w_a = float(w_a)
+        if not 0 < w_a < 1:
+            raise ValueError("w_a must be between 0 and 1 (exclusive)")
+        return super().__new__(cls, w_a)
+
+    @property
+    def weight_a(self):
+        return self.w_a
+
+    @property
+    def label(self):
+        return f"{self.w_a * 100:g}/{(1 - self.w_a) * 100:g}"
+
+    def value_ratio(self, mult_a, mult_b):
+        return self.impermanent_loss(mult_a, mult_b)[1]
+
+    def hodl_ratio(self, mult_a, mult_b):
+        return _hodl_ratio(self.w_a, mult_a, mult_b)
+
+    def impermanent_loss(self, mult_a, mult_b):
+        return calculate_impermanent_loss_pair(1.0, 1.0, mult_a, mult_b, w_a=self.w_a)
+
+
+class ConcentratedPool(namedtuple("ConcentratedPool", ["lower", "upper"])):
+    # Uniswap-v3-style position on the price of A in B, with the range given
+    # as multipliers of the entry price (e.g. 0.5 and 2.0 for "half to
+    # double"). With sqrt bounds sa, sb and s = clip(sqrt(p), sa, sb), a
+    # position of liquidity L holds x = L(1/s - 1/sb) of A and y = L(s - sa)
+    # of B; L cancels out of every ratio, so it is taken as 1.
+
+    __slots__ = ()
+
+    def __new__(cls, lower=0.5, upper=2.0):
+        lower, upper = float(lower), float(upper)
+        if not 0 < lower < upper:
+            raise ValueError("Range must satisfy 0 < lower < upper")
+        return super().__new__(cls, lower, upper)
+
+    @classmethod
+    def from_prices(cls, entry_price, low_price, high_price):
+        return cls(low_price / entry_price, high_price / entry_price)
+
+    def _amounts(self, price):
+        sa, sb = np.sqrt(self.lower), np.sqrt(self.upper)
+        s = np.clip(np.sqrt(price), sa, sb)
+        return 1 / s - 1 / sb, s - sa
+
+    def _entry(self):
+        x0, y0 = self._amounts(1.0)
+        return x0, y0, x0 + y0
+
+    @property
+    def weight_a(self):
+        x0, _, v0 = self._entry()
+        return float(x0 / v0)
+
+    @property
+    def label(self):
+        return f"range {self.lower:g}x-{self.upper:g}x"
+
+    def value_ratio(self, mult_a, mult_b):
+        mult_a = np.asarray(mult_a, dtype=np.float64)
+        mult_b = np.asarray(mult_b, dtype=np.float64)
+        price = mult_a / mult_b
+        x, y = self._amounts(price)
+        _, _, v0 = self._entry()
+        return mult_b * (x * price + y) / v0
+
+    def hodl_ratio(self, mult_a, mult_b):
+        return _hodl_ratio(self.weight_a, mult_a, mult_b)
+
+    def impermanent_loss(self, mult_a, mult_b):
+        return _impermanent_loss(self, mult_a, mult_b)
+
+
+class DynamicWeightPool(namedtuple("DynamicWeightPool", ["w_start", "w_end", "elapsed", "steps"])):
+    # Liquidity bootstrapping pool: asset A's weight moves linearly from
+    # w_start to w_end over the schedule, and `elapsed` (a scalar in 0..1,
+    # part of the model so it stays hashable) is how far along it is. The
+    # result is path dependent, so prices are assumed to move geometrically
+    # from entry to the given multiplier over `steps` weight updates, each
+    # followed by an arbitrage back to the external price. Balances do not
+    # change when weights do, only the invariant; with w_start == w_end this
+    # reduces exactly to WeightedPool.
+
+    __slots__ = ()
+
+    def __new__(cls, w_start=0.9, w_end=0.5, elapsed=1.0, steps=100):
+        w_start, w_end, elapsed, steps = float(w_start), float(w_end), float(elapsed), int(steps)
+        if not (0 < w_start < 1 and 0 < w_end < 1):
+            raise ValueError("LBP weights must be between 0 and 1 (exclusive)")
+        if not 0 <= elapsed <= 1:
+            raise ValueError("elapsed must be a fraction of the schedule between 0 and 1")
+        if steps < 1:
+            raise ValueError("steps must be at least 1")
+        return super().__new__(cls, w_start, w_end, elapsed, steps)
+
+    @property
+    def weight_a(self):
+        return self.w_start
+
+    @property
+    def label(self):
+        return f"LBP {self.w_start * 100:g}→{self.w_end * 100:g} @ {self.elapsed * 100:g}%"
+
+    def value_ratio(self, mult_a, mult_b):
+        mult_a = np.asarray(mult_a, dtype=np.float64)
+        mult_b = np.asarray(mult_b, dtype=np.float64)
+        log_price = np.log(mult_a / mult_b)
+
+        # Balances per unit of initial value, in units of the entry price.
+        w = self.w_start
+        x = np.full(log_price.shape, w)
+        y = np.full(log_price.shape, 1 - w)
+        price = np.ones(log_price.shape)
+        for k in range(1, self.steps + 1):
+            fraction = k / self.steps
+            w = self.w_start + (self.w_end - self.w_start) * self.elapsed * fraction
+            price = np.exp(log_price * fraction)
+            # Keep x^w * y^(1-w) and move the spot price y*w / (x*(1-w)) to `price`.
+            invariant = x ** w * y ** (1 - w)
+            x = invariant * (w / (price * (1 - w))) ** (1 - w)
+            y = price * x * (1 - w) / w
+        return mult_b * (x * price + y)
+
+    def hodl_ratio(self, mult_a, mult_b):
+        return _hodl_ratio(self.w_start, mult_a, mult_b)
+
+    def impermanent_loss(self, mult_a, mult_b):
+        return _impermanent_loss(self, mult_a, mult_b)
+
+
+DEFAULT_POOL = WeightedPool(0.8)
+
+
+def compare_impermanent_loss(pools, mult_a, mult_b):
+    # IL % for every pool at the same price moves, stacked on a new leading
+    # axis: result[i] belongs to pools[i].
+    mult_a = np.asarray(mult_a, dtype=np.float64)
+    mult_b = np.asarray(mult_b, dtype=np.float64)
+    return np.stack([pool.impermanent_loss(mult_a, mult_b)[0] for pool in pools])
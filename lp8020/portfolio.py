@@ -0,0 +1,208 @@
+import csv
+import io
+import json
+from collections import namedtuple
+
+import numpy as np
+
+from .il_engine import calculate_impermanent_loss_pair
+
+PortfolioSummary = namedtuple("PortfolioSummary", [
+    "positions", "priced", "size", "lp_value", "hodl_value", "difference", "il_percentage",
+])
+
+POSITION_FIELDS = ("id", "pool", "asset_a", "asset_b", "weight_a", "entry_price_a", "entry_price_b", "size", "entry_time")
+
+
+def _parse_time(value):
+    if value in (None, ""):
+        return np.nan
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.datetime64(str(value).replace("Z", ""), "s").astype(np.int64).astype(np.float64)
+
+
+def _read_records(source):
+    if isinstance(source, (str, bytes)) or hasattr(source, "__fspath__"):
+        path = str(source)
+        with open(path, "r", encoding="utf-8", newline="") as f:
+            return _read_records_from(f, path.endswith((".jsonl", ".ndjson", ".json")))
+    if isinstance(source, io.TextIOBase):
+        return _read_records_from(source, False)
+    # Binary file-like objects such as Streamlit uploads. The wrapper is
+    # detached afterwards so it does not close the caller's stream.
+    name = getattr(source, "name", "")
+    stream = io.TextIOWrapper(source, encoding="utf-8", newline="")
+    try:
+        return _read_records_from(stream, name.endswith((".jsonl", ".ndjson", ".json")))
+    finally:
+        stream.detach()
+
+
+def _read_records_from(stream, is_json):
+    if is_json:
+        return [json.loads(line) for line in stream if line.strip()]
+    return list(csv.DictReader(stream))
+
+
+class Portfolio:
+    # Many weighted two-asset LP positions evaluated together. Prices live in
+    # one array indexed by asset, so each asset is looked up once no matter
+    # how many positions hold it. set_prices() only recomputes the positions
+    # that reference an asset whose price actually changed.
+
+    def __init__(self, ids, pools, asset_a, asset_b, weight_a, entry_price_a, entry_price_b, size, entry_time=None):
+        self.ids = np.asarray(ids, dtype=object)
+        self.pools = np.asarray(pools, dtype=object)
+        n = len(self.ids)
+
+        self.assets, codes = np.unique(np.concatenate([np.asarray(asset_a, dtype=str), np.asarray(asset_b, dtype=str)]), return_inverse=True)
+        self.asset_a = codes[:n]
+        self.asset_b = codes[n:]
+        self._asset_index = {asset: i for i, asset in enumerate(self.assets.tolist())}
+
+        self.weight_a = np.asarray(weight_a, dtype=np.float64)
+        if np.any((self.weight_a <= 0) | (self.weight_a >= 1)):
+            raise ValueError("weight_a must be between 0 and 1 (exclusive) for every position")
+        self.entry_price_a = np.asarray(entry_price_a, dtype=np.float64)
+        self.entry_price_b = np.asarray(entry_price_b, dtype=np.float64)
+        self.size = np.asarray(size, dtype=np.float64)
+        self.entry_time = np.full(n, np.nan) if entry_time is None else np.asarray(entry_time, dtype=np.float64)
+
+        # CSR-style asset -> positions index: positions holding asset k are
+        # _by_asset[_by_asset_ptr[k]:_by_asset_ptr[k + 1]].
+        holders = np.concatenate([self.asset_a, self.asset_b])
+        rows = np.concatenate([np.arange(n), np.arange(n)])
+        order = np.argsort(holders, kind="stable")
+        self._by_asset = rows[order]
+        self._by_asset_ptr = np.searchsorted(holders[order], np.arange(len(self.assets) + 1))
+
+        self.prices = np.full(len(self.assets), np.nan)
+        self.il_percentage = np.full(n, np.nan)
+        self.lp_value = np.full(n, np.nan)
+        self.hodl_value = np.full(n, np.nan)
+
+    def __len__(self):
+        return len(self.ids)
+
+    @classmethod
+    def from_records(cls, records, default_weight_a=0.8):
+        if not records:
+            raise ValueError("Portfolio file contains no positions")
+
+        def column(name, default=None, required=True):
+            values = []
+            for i, record in enumerate(records):
+                value = record.get(name)
+                if value in (None, ""):
+                    if default is None and required:
+                        raise ValueError(f"Position {i + 1} is missing {name}")
+                    value = default
+                values.append(value)
+            return values
+
+        return cls(
+            ids=column("id", required=False) if "id" in records[0] else list(range(1, len(records) + 1)),
+            pools=column("pool", "", required=False),
+            asset_a=column("asset_a"),
+            asset_b=column("asset_b"),
+            weight_a=column("weight_a", default_weight_a),
+            entry_price_a=column("entry_price_a"),
+            entry_price_b=column("entry_price_b"),
+            size=column("size"),
+            entry_time=[_parse_time(value) for value in column("entry_time", required=False)],
+        )
+
+    @classmethod
+    def from_file(cls, source, default_weight_a=0.8):
+        return cls.from_records(_read_records(source), default_weight_a=default_weight_a)
+
+    def _compute(self, rows, prices):
+        change_a = prices[self.asset_a[rows]] / self.entry_price_a[rows]
+        change_b = prices[self.asset_b[rows]] / self.entry_price_b[rows]
+        w_a = self.weight_a[rows]
+        il_percentage, pool_value_ratio = calculate_impermanent_loss_pair(1.0, 1.0, change_a, change_b, w_a=w_a)
+        size = self.size[rows]
+        return il_percentage, size * pool_value_ratio, size * (w_a * change_a + (1 - w_a) * change_b)
+
+    def set_prices(self, prices):
+        # `prices` maps asset id -> price; unknown assets are ignored. Returns
+        # the number of positions that were recomputed.
+        updates = [(self._asset_index[asset], price) for asset, price in prices.items() if asset in self._asset_index]
+        if not updates:
+            return 0
+        codes = np.fromiter((code for code, _ in updates), dtype=np.intp, count=len(updates))
+        values = np.fromiter((price for _, price in updates), dtype=np.float64, count=len(updates))
+        changed = self.prices[codes] != values
+        if not changed.any():
+            return 0
+        codes, values = codes[changed], values[changed]
+        self.prices[codes] = values
+
+        rows = np.unique(np.concatenate([self._by_asset[self._by_asset_ptr[c]:self._by_asset_ptr[c + 1]] for c in codes]))
+        self.il_percentage[rows], self.lp_value[rows], self.hodl_value[rows] = self._compute(rows, self.prices)
+        return len(rows)
+
+    def refresh(self, service):
+        # Pulls every asset of the portfolio from a PriceService in one call.
+        quotes = service.get_quotes(self.assets.tolist())
+        return self.set_prices({asset: quote.price for asset, quote in quotes.items()})
+
+    def evaluate(self, prices):
+        # Hypothetical what-if: full evaluation at `prices` without touching
+        # the live state. Assets missing from `prices` keep their live price.
+        hypothetical = self.prices.copy()
+        for asset, price in prices.items():
+            if asset in self._asset_index:
+                hypothetical[self._asset_index[asset]] = price
+        il_percentage, lp_value, hodl_value = self._compute(np.arange(len(self)), hypothetical)
+        return self._columns(il_percentage, lp_value, hodl_value)
+
+    def _columns(self, il_percentage, lp_value, hodl_value):
+        return {
+            "id": self.ids,
+            "pool": self.pools,
+            "asset_a": self.assets[self.asset_a],
+            "asset_b": self.assets[self.asset_b],
+            "weight_a": self.weight_a,
+            "size": self.size,
+            "il_percentage": il_percentage,
+            "lp_value": lp_value,
+            "hodl_value": hodl_value,
+            "difference": lp_value - hodl_value,
+        }
+
+    def positions(self):
+        return self._columns(self.il_percentage, self.lp_value, self.hodl_value)
+
+    def summary(self):
+        priced = ~np.isnan(self.lp_value)
+        lp_value = float(self.lp_value[priced].sum())
+        hodl_value = float(self.hodl_value[priced].sum())
+        return PortfolioSummary(
+            positions=len(self),
+            priced=int(priced.sum()),
+            size=float(self.size.sum()),
+            lp_value=lp_value,
+            hodl_value=hodl_value,
+            difference=lp_value - hodl_value,
+            il_percentage=(lp_value / hodl_value - 1) * 100 if hodl_value else 0.0,
+        )
+
+    def by_pool(self):
+        pools, codes = np.unique(self.pools.astype(str), return_inverse=True)
+        priced = ~np.isnan(self.lp_value)
+        lp_value = np.bincount(codes, weights=np.where(priced, self.lp_value, 0.0), minlength=len(pools))
+        hodl_value = np.bincount(codes, weights=np.where(priced, self.hodl_value, 0.0), minlength=len(pools))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            il_percentage = np.where(hodl_value > 0, (lp_value / hodl_value - 1) * 100, 0.0)
+        return {
+            "pool": pools,
+            "positions": np.bincount(codes, minlength=len(pools)),
+            "size": np.bincount(codes, weights=self.size, minlength=len(pools)),
+            "lp_value": lp_value,
+            "hodl_value": hodl_value,
+            "difference": lp_value - hodl_value,
+            "il_percentage": il_percentage,
+        }
@@ -0,0 +1,289 @@
+import os
+import threading
+import time
+from collections import namedtuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from . import metrics
+from .price_store import get_default_store, series_name
+
+COINGECKO_API_URL = os.environ.get("COINGECKO_API_URL", "https://api.coingecko.com/api/v3")
+
+Quote = namedtuple("Quote", ["price", "change_24h", "last_updated", "fetched_at"])
+
+
+class PriceFeedError(Exception):
+    pass
+
+
+class PriceFeed:
+    # Process-wide quote cache in front of the CoinGecko simple/price endpoint.
+    #
+    # * fresh entries (younger than `ttl`) are served straight from memory;
+    # * stale entries (younger than `max_stale`) are served immediately while a
+    #   single background thread revalidates them;
+    # * concurrent misses for the same key wait on one in-flight request;
+    # * a 429 puts the feed into exponential backoff (honouring Retry-After),
+    #   during which callers only ever see cached data;
+    # * ids upstream has no price for (and failed requests) are remembered
+    #   for `negative_ttl`, so an unlisted id cannot trigger a request per call;
+    # * with a `store`, every fetched quote is appended to it and a cold cache
+    #   is seeded from the last stored price (served as stale).
+
+    def __init__(self, base_url=None, ttl=30.0, max_stale=600.0, timeout=5.0,
+                 min_backoff=5.0, max_backoff=300.0, session=None, store=None, negative_ttl=None):
+        self.base_url = (base_url or COINGECKO_API_URL).rstrip("/")
+        self.ttl = ttl
+        self.max_stale = max_stale
+        self.timeout = timeout
+        self.min_backoff = min_backoff
+        self.max_backoff = max_backoff
+        self.negative_ttl = ttl if negative_ttl is None else negative_ttl
+        self.session = session or self._make_session()
+        self.store = store
+
+        self._lock = threading.Lock()
+        self._cache = {}
+        self._inflight = {}
+        # key -> (message, expires_at): negative cache for missing ids/errors.
+        self._errors = {}
+        self._backoff = 0.0
+        self._backoff_until = 0.0
+        self._warmed = set()
+
+    @staticmethod
+    def _make_session():
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=32)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+
+    def get_price(self, asset_id, vs_currency="usd"):
+        quote = self.get_prices([asset_id], vs_currency).get(asset_id)
+        if quote is None:
+            with self._lock:
+                error = self._errors.get((asset_id, vs_currency))
+                backoff_left = self._backoff_until - time.time()
+            if backoff_left > 0:
+                raise PriceFeedError(f"Rate limited by upstream, retrying in {backoff_left:.0f}s")
+            raise PriceFeedError(error[0] if error else f"No price available for {asset_id}")
+        return quote
+
+    def get_prices(self, asset_ids, vs_currency="usd"):
+        # Returns {asset_id: Quote} for every id that has a usable price. Ids
+        # that are missing from the cache are fetched together in one request.
+        keys = [(asset_id, vs_currency) for asset_id in dict.fromkeys(asset_ids)]
+        quotes = {}
+        stale, waits, lead = [], [], []
+        if self.store is not None:
+            self._warm_start([key for key in keys if key not in self._warmed])
+
+        with self._lock:
+            now = time.time()
+            backing_off = now < self._backoff_until
+            for key in keys:
+                quote = self._cache.get(key)
+                if quote is not None and now - quote.fetched_at < self.ttl:
+                    quotes[key[0]] = quote
+                    metrics.cache_result("price_feed", "hit")
+                elif quote is not None and (backing_off or now - quote.fetched_at < self.max_stale):
+                    quotes[key[0]] = quote
+                    stale.append(key)
+                    metrics.cache_result("price_feed", "stale")
+                elif key in self._inflight:
+                    waits.append(self._inflight[key])
+                    metrics.cache_result("price_feed", "coalesced")
+                elif key in self._errors and now < self._errors[key][1]:
+                    metrics.cache_result("price_feed", "negative")
+                elif not backing_off:
+                    lead.append(key)
+                    metrics.cache_result("price_feed", "miss")
+            if stale and not backing_off:
+                self._spawn_refresh([
+                    key for key in stale
+                    if key not in self._inflight and (key not in self._errors or now >= self._errors[key][1])
+                ])
+            if lead:
+                event = threading.Event()
+                for key in lead:
+                    self._inflight[key] = event
+                waits.append(event)
+
+        if lead:
+            self._refresh(lead, event)
+        for event in waits:
+            event.wait(self.timeout * 2)
+
+        with self._lock:
+            now = time.time()
+            for key in keys:
+                quote = self._cache.get(key)
+                if key[0] not in quotes and quote is not None and now - quote.fetched_at < self.max_stale:
+                    quotes[key[0]] = quote
+        return quotes
+
+    def fetch_many(self, asset_ids, vs_currency="usd"):
+        # Unconditional batched refresh used by the background price service.
+        # Still honours the 429 backoff, in which case cached quotes are
+        # returned; otherwise, like get_prices, nothing older than max_stale.
+        keys = [(asset_id, vs_currency) for asset_id in dict.fromkeys(asset_ids)]
+        with self._lock:
+            now = time.time()
+            backing_off = now < self._backoff_until
+            wanted = [key for key in keys if key not in self._errors or now >= self._errors[key][1]]
+        if wanted and not backing_off:
+            self._refresh(wanted)
+        with self._lock:
+            now = time.time()
+            return {key[0]: self._cache[key] for key in keys if key in self._cache and self._usable(self._cache[key], now)}
+
+    def is_usable(self, quote):
+        with self._lock:
+            return self._usable(quote, time.time())
+
+    def _usable(self, quote, now):
+        # Must be called with self._lock held.
+        return now - quote.fetched_at < self.max_stale or now < self._backoff_until
+
+    def _warm_start(self, keys):
+        for key in keys:
+            self._warmed.add(key)
+            try:
+                history = self.store.read(series_name(*key), since=time.time() - 86400 - 3600)
+            except (OSError, ValueError):
+                continue
+            if len(history.timestamp) == 0:
+                continue
+            ts, price = float(history.timestamp[-1]), float(history.price[-1])
+            if time.time() - ts >= self.max_stale:
+                continue
+            day_ago = int(history.timestamp.searchsorted(ts - 86400, side="right")) - 1
+            change_24h = (price / float(history.price[day_ago]) - 1) * 100 if day_ago >= 0 else 0.0
+            with self._lock:
+                self._cache.setdefault(key, Quote(price, change_24h, int(ts), ts))
+
+    def _record(self, quotes):
+        if self.store is None:
+            return
+        for (asset_id, vs_currency), quote in quotes.items():
+            try:
+                self.store.append(series_name(asset_id, vs_currency), quote.last_updated, quote.price)
+            except OSError:
+                pass
+
+    def _spawn_refresh(self, keys):
+        # Must be called with self._lock held.
+        if not keys:
+            return
+        event = threading.Event()
+        for key in keys:
+            self._inflight[key] = event
+        threading.Thread(target=self._refresh, args=(keys, event), daemon=True).start()
+
+    def _refresh(self, keys, event=None):
+        by_currency = {}
+        for asset_id, vs_currency in keys:
+            by_currency.setdefault(vs_currency, []).append(asset_id)
+        try:
+            for vs_currency, asset_ids in by_currency.items():
+                quotes = self._fetch(asset_ids, vs_currency)
+                with self._lock:
+                    self._cache.update(quotes)
+                    expires_at = time.time() + self.negative_ttl
+                    for asset_id in asset_ids:
+                        key = (asset_id, vs_currency)
+                        if key in quotes:
+                            self._errors.pop(key, None)
+                        else:
+                            self._errors[key] = (f"No price available for {asset_id}", expires_at)
+                self._record(quotes)
+        except Exception as e:
+            metrics.upstream_error(type(e).__name__)
+            with self._lock:
+                expires_at = time.time() + self.negative_ttl
+                for key in keys:
+                    self._errors[key] = (str(e), expires_at)
+        finally:
+            if event is not None:
+                with self._lock:
+                    for key in keys:
+                        if self._inflight.get(key) is event:
+                            del self._inflight[key]
+                event.set()
+
+    def _fetch(self, asset_ids, vs_currency):
+        params = {
+            'ids': ",".join(asset_ids),
+            'vs_currencies': vs_currency,
+            'include_24hr_change': 'true',
+            'include_last_updated_at': 'true'
+        }
+        started = time.perf_counter()
+        response = self.session.get(f"{self.base_url}/simple/price", params=params, timeout=self.timeout)
+        metrics.upstream_request(time.perf_counter() - started, response.status_code)
+
+        if response.status_code == 429:
+            self._enter_backoff(response.headers.get("Retry-After"))
+            raise PriceFeedError("Rate limited by upstream (HTTP 429)")
+        response.raise_for_status()
+
+        with self._lock:
+            self._backoff = 0.0
+            self._backoff_until = 0.0
+
+        data = response.json()
+        fetched_at = time.time()
+        quotes = {}
+        for asset_id in asset_ids:
+            if asset_id not in data or vs_currency not in data[asset_id]:
+                continue
+            entry = data[asset_id]
+            quotes[(asset_id, vs_currency)] = Quote(
+                price=entry[vs_currency],
+                change_24h=entry.get(f"{vs_currency}_24h_change") or 0.0,
+                last_updated=entry.get('last_updated_at', int(fetched_at)),
+                fetched_at=fetched_at,
+            )
+        if not quotes:
+            raise PriceFeedError(f"Upstream returned no price for {', '.join(asset_ids)}")
+        return quotes
+
+    def _enter_backoff(self, retry_after=None):
+        with self._lock:
+            self._backoff = min(max(self._backoff * 2, self.min_backoff), self.max_backoff)
+            delay = self._backoff
+            if retry_after:
+                try:
+                    delay = min(max(float(retry_after), delay), self.max_backoff)
+                except ValueError:
+                    pass
+            self._backoff_until = time.time() + delay
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+            self._errors.clear()
+            self._warmed.clear()
+            self._backoff = 0.0
+            self._backoff_until = 0.0
+
+
+_default_feed = None
+_default_feed_lock = threading.Lock()
+
+
+def get_default_feed():
+    # Streamlit imports this module once per server process, so every session
+    # shares the same feed (and therefore the same cache and HTTP pool).
+    global _default_feed
+    with _default_feed_lock:
+        if _default_feed is None:
+            try:
+                store = get_default_store()
+            except OSError:
+                store = None
+            _default_feed = PriceFeed(store=store)
+        return _default_feed
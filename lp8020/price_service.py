@@ -0,0 +1,148 @@
+import asyncio
+import threading
+import time
+
+from . import metrics
+from .price_feed import get_default_feed
+
+DEFAULT_ASSETS = ("initia", "usd-coin")
+
+
+class PriceService:
+    # Keeps an in-memory snapshot of quotes for a set of asset ids, refreshed
+    # with one batched request per tick by an asyncio task on its own thread.
+    # Readers only ever swap-read `self._snapshot`, so they never block on I/O.
+
+    def __init__(self, asset_ids=DEFAULT_ASSETS, vs_currency="usd", interval=30.0, feed=None, compact_interval=3600.0):
+        self.vs_currency = vs_currency
+        self.interval = interval
+        self.compact_interval = compact_interval
+        self.feed = feed or get_default_feed()
+
+        self._asset_ids = tuple(dict.fromkeys(asset_ids))
+        self._snapshot = {}
+        self._lock = threading.Lock()
+        self._thread = None
+        self._loop = None
+        self._stop = None
+        self._wakeup = None
+
+    @property
+    def asset_ids(self):
+        return self._asset_ids
+
+    def track(self, asset_ids):
+        with self._lock:
+            new_ids = [asset_id for asset_id in asset_ids if asset_id not in self._asset_ids]
+            if not new_ids:
+                return
+            self._asset_ids = self._asset_ids + tuple(dict.fromkeys(new_ids))
+        self._wake()
+
+    def snapshot(self):
+        return self._snapshot
+
+    def get_quotes(self, asset_ids=None):
+        # Non-blocking once warm; on a cold start, for ids the background task
+        # has not picked up yet, or for entries past the feed's max_stale (an
+        # upstream outage) falls back to the shared feed, which coalesces the
+        # request with any concurrent callers.
+        asset_ids = self._asset_ids if asset_ids is None else tuple(asset_ids)
+        snapshot = self._snapshot
+        missing = [
+            asset_id for asset_id in asset_ids
+            if asset_id not in snapshot or not self.feed.is_usable(snapshot[asset_id])
+        ]
+        metrics.cache_result("price_service", "hit", len(asset_ids) - len(missing))
+        metrics.cache_result("price_service", "miss", len(missing))
+        if not missing:
+            return {asset_id: snapshot[asset_id] for asset_id in asset_ids}
+
+        fetched = self.feed.get_prices(missing, self.vs_currency)
+        # Only ids upstream actually prices join the background batch; the
+        # feed's negative cache answers for the rest.
+        self.track(fetched)
+        with self._lock:
+            self._snapshot = {**self._snapshot, **fetched}
+        quotes = {asset_id: snapshot[asset_id] for asset_id in asset_ids if asset_id not in missing}
+        quotes.update(fetched)
+        return quotes
+
+    def start(self):
+        with self._lock:
+            if self._thread is not None:
+                return self
+            ready = threading.Event()
+            self._thread = threading.Thread(target=self._run, args=(ready,), name="price-service", daemon=True)
+            self._thread.start()
+        ready.wait()
+        return self
+
+    def stop(self, timeout=None):
+        with self._lock:
+            thread, loop, stop = self._thread, self._loop, self._stop
+            self._thread = None
+        if thread is None:
+            return
+        loop.call_soon_threadsafe(stop.set)
+        thread.join(timeout)
+
+    def _wake(self):
+        loop, wakeup = self._loop, self._wakeup
+        if loop is not None and not loop.is_closed():
+            loop.call_soon_threadsafe(wakeup.set)
+
+    def _run(self, ready):
+        asyncio.run(self._refresh_loop(ready))
+
+    async def _refresh_loop(self, ready):
+        self._loop = asyncio.get_running_loop()
+        self._stop = asyncio.Event()
+        self._wakeup = asyncio.Event()
+        ready.set()
+        last_compaction = time.monotonic()
+
+        while not self._stop.is_set():
+            self._wakeup.clear()
+            asset_ids = self._asset_ids
+            try:
+                quotes = await asyncio.to_thread(self.feed.fetch_many, asset_ids, self.vs_currency)
+            except Exception:
+                quotes = {}
+            with self._lock:
+                # fetch_many leaves out quotes past max_stale; drop those
+                # from the snapshot too rather than keep serving them.
+                self._snapshot = {
+                    **{asset_id: quote for asset_id, quote in self._snapshot.items() if self.feed.is_usable(quote)},
+                    **quotes,
+                }
+
+            store = getattr(self.feed, "store", None)
+            if store is not None and time.monotonic() - last_compaction >= self.compact_interval:
+                last_compaction = time.monotonic()
+                try:
+                    await asyncio.to_thread(store.compact_all)
+                except OSError:
+                    pass
+
+            stop_task = asyncio.ensure_future(self._stop.wait())
+            wake_task = asyncio.ensure_future(self._wakeup.wait())
+            _, pending = await asyncio.wait(
+                [stop_task, wake_task], timeout=self.interval, return_when=asyncio.FIRST_COMPLETED
+            )
+            for task in pending:
+                task.cancel()
+
+        self._loop = None
+
+
+_default_service = None
+_default_service_lock = threading.Lock()
+
+
+def get_default_service():
+    global _default_service
+    with _default_service_lock:
+        if _default_service is None:
+            _default_service = PriceService().start()
+        return _default_service
@@ -0,0 +1,163 @@
+import os
+import re
+import threading
+import time
+from collections import namedtuple
+
+import numpy as np
+
+DEFAULT_STORE_DIR = os.environ.get("LP8020_PRICE_STORE", os.path.join(os.path.expanduser("~"), ".cache", "lp8020", "prices"))
+
+TS_DTYPE = np.dtype("<f8")
+PRICE_DTYPE = np.dtype("<f8")
+# One record per point, so both columns of a row are always written, renamed
+# and sized together.
+RECORD_DTYPE = np.dtype([("ts", TS_DTYPE), ("px", PRICE_DTYPE)])
+
+PriceHistory = namedtuple("PriceHistory", ["timestamp", "price"])
+
+_SAFE_NAME = re.compile(r"[^A-Za-z0-9_.-]")
+
+
+def series_name(asset_id, vs_currency="usd"):
+    return f"{asset_id}-{vs_currency}"
+
+
+class PriceStore:
+    # Append-only store: every series is one file (<id>.dat) of interleaved
+    # little-endian float64 (timestamp, price) records. Appends go to the end
+    # of the file; reads are np.memmap views, so nothing is copied until it
+    # is touched. compact() sorts, de-duplicates and thins old points, then
+    # swaps the new file in with a single rename.
+
+    def __init__(self, path=None):
+        self.path = path or DEFAULT_STORE_DIR
+        os.makedirs(self.path, exist_ok=True)
+        self._lock = threading.Lock()
+        self._migrate_columns()
+
+    def _file(self, series):
+        return os.path.join(self.path, _SAFE_NAME.sub("_", series) + ".dat")
+
+    def series(self):
+        return sorted(name[:-4] for name in os.listdir(self.path) if name.endswith(".dat"))
+
+    def _migrate_columns(self):
+        # Older versions kept a series as two column files (<id>.ts / <id>.px);
+        # fold them into one record file, keeping the rows both columns have.
+        for name in os.listdir(self.path):
+            if not name.endswith(".ts"):
+                continue
+            base = os.path.join(self.path, name[:-3])
+            ts_path, px_path, path = base + ".ts", base + ".px", base + ".dat"
+            if not os.path.exists(path) and os.path.exists(px_path):
+                timestamps = np.fromfile(ts_path, dtype=TS_DTYPE)
+                prices = np.fromfile(px_path, dtype=PRICE_DTYPE)
+                rows = min(len(timestamps), len(prices))
+                self._write(path, timestamps[:rows], prices[:rows])
+            for legacy in (ts_path, px_path):
+                if os.path.exists(legacy):
+                    os.remove(legacy)
+
+    @staticmethod
+    def _records(timestamps, prices):
+        records = np.empty(len(timestamps), dtype=RECORD_DTYPE)
+        records["ts"] = timestamps
+        records["px"] = prices
+        return records
+
+    def _write(self, path, timestamps, prices):
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(self._records(timestamps, prices).tobytes())
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+
+    def append(self, series, timestamps, prices):
+        timestamps = np.atleast_1d(np.asarray(timestamps, dtype=TS_DTYPE))
+        prices = np.atleast_1d(np.asarray(prices, dtype=PRICE_DTYPE))
+        if timestamps.shape != prices.shape:
+            raise ValueError("timestamps and prices must have the same length")
+        path = self._file(series)
+        with self._lock:
+            with open(path, "ab") as f:
+                # Drop a partial record left by a crash mid-append before
+                # adding more, so every later record stays aligned.
+                size = os.fstat(f.fileno()).st_size
+                if size % RECORD_DTYPE.itemsize:
+                    f.truncate(size - size % RECORD_DTYPE.itemsize)
+                f.write(self._records(timestamps, prices).tobytes())
+
+    def read(self, series, since=None):
+        # Zero-copy, read-only views. Rows are in append order, which is
+        # chronological for a live feed; `since` assumes that ordering. The
+        # row count and the mapping come from the same open file, so a
+        # concurrent compaction cannot pair them across generations.
+        try:
+            f = open(self._file(series), "rb")
+        except FileNotFoundError:
+            rows, f = 0, None
+        else:
+            rows = os.fstat(f.fileno()).st_size // RECORD_DTYPE.itemsize
+        if rows == 0:
+            if f is not None:
+                f.close()
+            empty = np.empty(0, dtype=TS_DTYPE)
+            return PriceHistory(empty, empty.astype(PRICE_DTYPE))
+        with f:
+            records = np.memmap(f, dtype=RECORD_DTYPE, mode="r", shape=(rows,))
+        timestamps, prices = records["ts"], records["px"]
+        if since is not None:
+            start = int(np.searchsorted(timestamps, since, side="left"))
+            timestamps, prices = timestamps[start:], prices[start:]
+        return PriceHistory(timestamps, prices)
+
+    def latest(self, series):
+        history = self.read(series)
+        if len(history.timestamp) == 0:
+            return None
+        return float(history.timestamp[-1]), float(history.price[-1])
+
+    def compact(self, series, keep_full_seconds=7 * 86400, bucket_seconds=300):
+        # Sorts and de-duplicates the series. Points older than
+        # `keep_full_seconds` are thinned to the last point per bucket.
+        with self._lock:
+            history = self.read(series)
+            if len(history.timestamp) == 0:
+                return 0
+            timestamps = np.array(history.timestamp)
+            prices = np.array(history.price)
+            del history
+
+            order = np.argsort(timestamps, kind="stable")
+            timestamps, prices = timestamps[order], prices[order]
+            # Keep the last write for duplicate timestamps.
+            keep = np.append(timestamps[1:] != timestamps[:-1], True)
+            timestamps, prices = timestamps[keep], prices[keep]
+
+            if keep_full_seconds is not None and bucket_seconds:
+                cutoff = time.time() - keep_full_seconds
+                old = timestamps < cutoff
+                buckets = np.floor(timestamps / bucket_seconds)
+                last_in_bucket = np.append(buckets[1:] != buckets[:-1], True)
+                keep = ~old | last_in_bucket
+                timestamps, prices = timestamps[keep], prices[keep]
+
+            self._write(self._file(series), timestamps, prices)
+            return len(timestamps)
+
+    def compact_all(self, **kwargs):
+        return {series: self.compact(series, **kwargs) for series in self.series()}
+
+
+_default_store = None
+_default_store_lock = threading.Lock()
+
+
+def get_default_store():
+    global _default_store
+    with _default_store_lock:
+        if _default_store is None:
+            _default_store = PriceStore()
+        return _default_store
@@ -0,0 +1,100 @@
+from collections import namedtuple
+
+import numpy as np
+
+PriceRange = namedtuple("PriceRange", ["low", "high"])
+
+DAYS_PER_YEAR = 365.0
+
+
+# For a two-asset weighted pool, LP / HODL only depends on the relative price
+# move r = (p1_a / p0_a) / (p1_b / p0_b):
+#
+#     g(r) = r ** w / (w * r + 1 - w)
+#
+# g(1) = 1 is its maximum, and g decreases monotonically on either side. All
+# solvers below work on that ratio and broadcast over their array arguments.
+
+
+def value_ratio(price_ratio, w_a=0.8):
+    r = np.asarray(price_ratio, dtype=np.float64)
+    w = np.asarray(w_a, dtype=np.float64)
+    return r ** w / (w * r + 1 - w)
+
+
+def fee_return(fee_apr, days, compounding=False):
+    fee_apr = np.asarray(fee_apr, dtype=np.float64)
+    years = np.asarray(days, dtype=np.float64) / DAYS_PER_YEAR
+    if compounding:
+        return (1 + fee_apr) ** years - 1
+    return fee_apr * years
+
+
+def breakeven_fee_apr(price_ratio, days, w_a=0.8, compounding=False):
+    # Closed form: LP * (1 + fees) == HODL  =>  fees = 1 / g(r) - 1, annualised.
+    required = 1 / value_ratio(price_ratio, w_a) - 1
+    years = np.asarray(days, dtype=np.float64) / DAYS_PER_YEAR
+    if compounding:
+        return (1 + required) ** (1 / years) - 1
+    return required / years
+
+
+def _newton_root(log_target, w, x0, iterations):
+    # Solves h(x) = w*x - log(w*e^x + 1 - w) - log_target = 0 for x = log r.
+    # h is concave, so Newton started outside the root (where h < 0) moves
+    # monotonically towards it without overshooting.
+    x = x0
+    for _ in range(iterations):
+        ex = np.exp(x)
+        denom = w * ex + 1 - w
+        h = w * x - np.log(denom) - log_target
+        dh = w - w * ex / denom
+        step = np.where(dh != 0, h / np.where(dh != 0, dh, 1.0), 0.0)
+        x = x - step
+        if np.all(np.abs(step) < 1e-12):
+            break
+    return x
+
+
+def breakeven_price_range(fee_apr, days, w_a=0.8, compounding=False, iterations=100):
+    # Range of relative price moves r for which LP plus fees earned over
+    # `days` still matches or beats HODL. Returns PriceRange(low, high) arrays
+    # with low <= 1 <= high; NaN where fees are negative.
+    fees = fee_return(fee_apr, days, compounding)
+    w = np.asarray(w_a, dtype=np.float64)
+    fees, w = np.broadcast_arrays(fees, w)
+    if np.any((w <= 0) | (w >= 1)):
+        raise ValueError("w_a must be between 0 and 1 (exclusive)")
+
+    valid = fees > 0
+    safe_fees = np.where(valid, fees, 1.0)
+    log_target = -np.log1p(safe_fees)
+
+    if np.all(w == 0.5):
+        # Closed form for 50/50 pools: with s = sqrt(r), c*s^2 - 2*s + c = 0.
+        c = np.exp(log_target)
+        root = np.sqrt(1 - c ** 2)
+        low = ((1 - root) / c) ** 2
+        high = ((1 + root) / c) ** 2
+    else:
+        # Brackets from dropping one term of the denominator, each of which
+        # guarantees h <= 0 at the starting point.
+        x_low = (log_target + np.log(1 - w)) / w
+        x_high = -(np.log(w) + log_target) / (1 - w)
+        low = np.exp(_newton_root(log_target, w, x_low, iterations))
+        high = np.exp(_newton_root(log_target, w, x_high, iterations))
+
+    low = np.where(valid, low, np.where(fees == 0, 1.0, np.nan))
+    high = np.where(valid, high, np.where(fees == 0, 1.0, np.nan))
+    if low.ndim == 0:
+        return PriceRange(float(low), float(high))
+    return PriceRange(low, high)
+
+
+def breakeven_days(price_ratio, fee_apr, w_a=0.8):
+    # Inverse of breakeven_fee_apr for simple (non-compounding) fees: the
+    # minimum number of days of fees needed to absorb IL at `price_ratio`.
+    required = 1 / value_ratio(price_ratio, w_a) - 1
+    fee_apr = np.asarray(fee_apr, dtype=np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(fee_apr > 0, required / fee_apr * DAYS_PER_YEAR, np.inf)
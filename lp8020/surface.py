@@ -0,0 +1,63 @@
+import math
+from functools import lru_cache
+
+import numpy as np
+
+from .il_engine import normalize_weights
+from .metrics import REGISTRY, lru_cache_collector
+from .pools import WeightedPool
+
+SURFACE_CACHE_SIZE = 16
+
+
+def price_multiplier_axis(low=0.1, high=20.0, resolution=500, log_spaced=True):
+    if low <= 0 or high <= low:
+        raise ValueError("Multiplier range must satisfy 0 < low < high")
+    if log_spaced:
+        return np.geomspace(low, high, resolution)
+    return np.linspace(low, high, resolution)
+
+
+@lru_cache(maxsize=SURFACE_CACHE_SIZE)
+def _il_surface(pool, low, high, resolution, log_spaced):
+    axis = price_multiplier_axis(low, high, resolution, log_spaced)
+    # z[i, j] is IL for asset A moving by axis[j] and asset B by axis[i],
+    # which is the row/column convention go.Surface and go.Heatmap expect.
+    # IL keeps its sign: some pool models (LBPs) can end up ahead of HODL.
+    z, _ = pool.impermanent_loss(axis[np.newaxis, :], axis[:, np.newaxis])
+    for array in (axis, z):
+        array.flags.writeable = False
+    return axis, axis, z
+
+
+def il_surface(weights=(0.8, 0.2), low=0.1, high=20.0, resolution=500, log_spaced=True, pool=None):
+    # Memoized on the (hashable) arguments with LRU eviction; the returned
+    # arrays are shared between callers and therefore read-only. `pool` is any
+    # lp8020.pools model and takes precedence over `weights`.
+    if pool is None:
+        w = normalize_weights(weights)
+        if w.shape != (2,):
+            raise ValueError(f"The IL surface is over two assets' price moves; got {w.shape[-1]} weights")
+        pool = WeightedPool(float(w[0]))
+    return _il_surface(pool, float(low), float(high), int(resolution), bool(log_spaced))
+
+
+def downsample_surface(x, y, z, max_points=150):
+    # Strided decimation that always keeps the last row/column so the plotted
+    # range matches the computed one.
+    def indices(n):
+        step = max(1, math.ceil(n / max_points))
+        idx = np.arange(0, n, step)
+        if idx[-1] != n - 1:
+            idx = np.append(idx, n - 1)
+        return idx
+
+    ix, iy = indices(len(x)), indices(len(y))
+    return x[ix], y[iy], z[np.ix_(iy, ix)]
+
+
+def clear_surface_cache():
+    _il_surface.cache_clear()
+
+
+REGISTRY.register_collector(lru_cache_collector(il_surface=_il_surface))
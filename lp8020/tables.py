@@ -0,0 +1,148 @@
+from collections import namedtuple
+from functools import lru_cache
+from string import Template
+
+import numpy as np
+
+from .metrics import REGISTRY, lru_cache_collector
+from .pools import DEFAULT_POOL, WeightedPool
+
+PUMP_SCENARIOS = (("2x", 2), ("4x", 4), ("10x", 10), ("20x", 20))
+DROP_SCENARIOS = (("-50%", 0.5), ("-75%", 0.25), ("-90%", 0.1))
+
+POSITION_SIZE = 1000
+WEIGHT_A = 0.8
+TABLE_CACHE_SIZE = 64
+
+ScenarioTables = namedtuple("ScenarioTables", ["columns", "pump_html", "drop_html", "complete"])
+
+# One stylesheet for every scenario table on the page, instead of repeating
+# the same inline style block in every cell.
+TABLE_CSS = """
+.scenario-table-wrap { margin: 20px 0; }
+.scenario-table { width: 100%; border-collapse: collapse; border-radius: 15px; overflow: hidden; }
+.scenario-table.pump { background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); box-shadow: 0 8px 25px rgba(102, 126, 234, 0.3); }
+.scenario-table.drop { background: linear-gradient(135deg, #f093fb 0%, #f5576c 100%); box-shadow: 0 8px 25px rgba(245, 87, 108, 0.3); }
+.scenario-table thead tr { background: rgba(0,0,0,0.4); }
+.scenario-table th { padding: 20px; text-align: center; color: white; font-weight: bold; font-size: 18px; border-bottom: 2px solid rgba(255,255,255,0.3); }
+.scenario-table td { padding: 16px; text-align: center; color: #ffffff; font-size: 20px; font-weight: bold; }
+.scenario-table tbody tr:nth-child(odd) { background: rgba(255,255,255,0.15); }
+.scenario-table tbody tr:nth-child(even) { background: rgba(255,255,255,0.08); }
+.scenario-table td.price { font-size: 18px; }
+.scenario-table td.green { color: #4ade80; }
+.scenario-table td.blue { color: #60a5fa; }
+.scenario-table td.amber { color: #fbbf24; }
+.scenario-table td.pink { color: #ffcccc; }
+"""
+
+_HEADER = (
+    "<thead><tr><th>Scenario</th><th>INIT Price</th><th>HODL 100% INIT</th><th>HODL $hodl_label</th>"
+    "<th>LP Value</th><th>IL %</th><th>LP vs 100% HODL</th><th>LP vs $hodl_label HODL</th></tr></thead>"
+)
+_TABLE = Template('<div class="scenario-table-wrap"><table class="scenario-table $kind">' + _HEADER + "<tbody>$rows</tbody></table></div>")
+_PUMP_ROW = Template(
+    '<tr><td>$scenario</td><td class="price">$$$price</td><td class="green">$$$hodl_100</td>'
+    '<td class="blue">$$$hodl_weighted</td><td class="amber">$$$lp_value</td><td>$il</td>'
+    '<td class="$diff_100_class">$$$diff_100</td><td class="$diff_weighted_class">$$$diff_weighted</td></tr>'
+)
+_DROP_ROW = Template(
+    '<tr><td>$scenario</td><td class="price">$$$price</td><td class="pink">$$$hodl_100</td>'
+    '<td class="amber">$$$hodl_weighted</td><td class="blue">$$$lp_value</td><td>$il</td>'
+    '<td class="$diff_100_class">$$$diff_100</td><td class="$diff_weighted_class">$$$diff_weighted</td></tr>'
+)
+
+
+def compute_scenarios(current_init_price, multipliers, position_size=POSITION_SIZE, weight_a=WEIGHT_A, pool=None):
+    # Every scenario in one vectorized IL call, returned column-wise. `pool`
+    # is any lp8020.pools model; without one it is a weighted pool at weight_a.
+    # The stable leg is held flat, so only the INIT price (in whatever unit
+    # the caller quotes it) enters the result.
+    if pool is None:
+        pool = WeightedPool(weight_a)
+    multipliers = np.asarray(multipliers, dtype=np.float64)
+    new_price = current_init_price * multipliers
+    il_percentage, pool_value_ratio = pool.impermanent_loss(multipliers, 1.0)
+    hodl_100 = position_size * multipliers
+    hodl_weighted = position_size * pool.hodl_ratio(multipliers, 1.0)
+    lp_value = position_size * pool_value_ratio
+    return {
+        "multiplier": multipliers,
+        "new_price": new_price,
+        "il_percentage": il_percentage,
+        "pool_value_ratio": pool_value_ratio,
+        "hodl_100": hodl_100,
+        "hodl_weighted": hodl_weighted,
+        "lp_value": lp_value,
+        "lp_vs_hodl_100": lp_value - hodl_100,
+        "lp_vs_hodl_weighted": lp_value - hodl_weighted,
+    }
+
+
+def _hodl_label(weight_a):
+    # "80/20" for the deposit split, rounded for display.
+    return f"{weight_a * 100:.0f}/{(1 - weight_a) * 100:.0f}"
+
+
+def _render_rows(columns, labels, start, stop, kind):
+    rows = []
+    for label, i in zip(labels, range(start, stop)):
+        new_price = columns["new_price"][i]
+        hodl_100 = columns["hodl_100"][i]
+        hodl_weighted = columns["hodl_weighted"][i]
+        lp_value = columns["lp_value"][i]
+        il = f"{columns['il_percentage'][i]:.2f}%"
+        diff_100 = f"{lp_value - hodl_100:+.0f}"
+        diff_weighted = f"{lp_value - hodl_weighted:+.0f}"
+        row = _PUMP_ROW if kind == "pump" else _DROP_ROW
+        rows.append(row.substitute(
+            scenario=label, price=f"{new_price:.4f}", hodl_100=f"{hodl_100:.0f}",
+            hodl_weighted=f"{hodl_weighted:.0f}", lp_value=f"{lp_value:.0f}", il=il,
+            diff_100=diff_100, diff_100_class="green" if "+" in diff_100 else "",
+            diff_weighted=diff_weighted, diff_weighted_class="green" if "+" in diff_weighted else "",
+        ))
+    return "".join(rows)
+
+
+def _complete_rows(columns, labels):
+    multiplier = columns["multiplier"]
+    il_percentage = columns["il_percentage"]
+    hodl_weighted = columns["hodl_weighted"]
+    lp_value = columns["lp_value"]
+    return {
+        "Scenario": list(labels),
+        "INIT Price": [f"${p:.4f}" for p in columns["new_price"]],
+        "Price Change": [f"{(m - 1) * 100:+.1f}%" for m in multiplier],
+        "Impermanent Loss": [f"{il:.2f}%" for il in il_percentage],
+        "HODL Value ($1000)": [f"${h:.2f}" for h in hodl_weighted],
+        "LP Value ($1000)": [f"${v:.2f}" for v in lp_value],
+        "Difference": [f"${h - v:+.2f}" for h, v in zip(hodl_weighted, lp_value)],
+    }
+
+
+@lru_cache(maxsize=TABLE_CACHE_SIZE)
+def _scenario_tables(current_init_price, pump, drop, pool):
+    labels = [label for label, _ in pump + drop]
+    columns = compute_scenarios(current_init_price, [m for _, m in pump + drop], pool=pool)
+    for column in columns.values():
+        column.flags.writeable = False
+    n_pump = len(pump)
+    hodl_label = _hodl_label(pool.weight_a)
+    return ScenarioTables(
+        columns=columns,
+        pump_html=_TABLE.substitute(kind="pump", hodl_label=hodl_label, rows=_render_rows(columns, labels[:n_pump], 0, n_pump, "pump")),
+        drop_html=_TABLE.substitute(kind="drop", hodl_label=hodl_label, rows=_render_rows(columns, labels[n_pump:], n_pump, len(labels), "drop")),
+        complete=_complete_rows(columns, labels),
+    )
+
+
+def scenario_tables(current_init_price, pump=PUMP_SCENARIOS, drop=DROP_SCENARIOS, pool=DEFAULT_POOL):
+    # Computes every scenario once and renders the pump table, the drop table
+    # and the complete-analysis columns from the same arrays. Results are
+    # memoized on (prices, scenario sets, pool) and shared, so treat them as
+    # read-only.
+    pump = tuple((str(label), float(m)) for label, m in pump)
+    drop = tuple((str(label), float(m)) for label, m in drop)
+    return _scenario_tables(float(current_init_price), pump, drop, pool)
+
+
+REGISTRY.register_collector(lru_cache_collector(scenario_tables=_scenario_tables))
@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+
+from lp8020.backtest import _timestamps_to_seconds, run_backtest, summarize_backtest
+
+
+def test_string_timestamps_are_seconds():
+    seconds = _timestamps_to_seconds(np.array(["2020-09-13 12:26:40", "2020-09-13 12:26:41"], dtype=object))
+    assert seconds.tolist() == [1_600_000_000.0, 1_600_000_001.0]
+
+
+def test_numeric_timestamps_pass_through():
+    seconds = _timestamps_to_seconds(np.array([1_600_000_000, 1_600_000_060]))
+    assert seconds.dtype == np.float64
+    assert seconds.tolist() == [1_600_000_000.0, 1_600_000_060.0]
+
+
+@pytest.mark.parametrize("unit", ["s", "ms", "us", "ns"])
+def test_datetime64_timestamps_are_seconds(unit):
+    values = np.array(["2020-09-13T12:26:40", "2020-09-13T12:27:40"], dtype=f"datetime64[{unit}]")
+    assert _timestamps_to_seconds(values).tolist() == [1_600_000_000.0, 1_600_000_060.0]
+
+
+def _write_series(path, rows):
+    with open(path, "w") as f:
+        f.write("timestamp,close\n")
+        for i in range(rows):
+            stamp = np.datetime64(1_600_000_000 + 60 * i, "s")
+            f.write(f"{stamp},{1.0 + 0.001 * i}\n")
+
+
+def test_summary_uses_epoch_seconds(tmp_path):
+    path = tmp_path / "prices.csv"
+    _write_series(path, 10)
+    summary = summarize_backtest(str(path), chunk_rows=4)
+    assert summary.rows == 10
+    assert summary.start == 1_600_000_000.0
+    assert summary.end == 1_600_000_000.0 + 9 * 60
+    assert 1_600_000_000.0 <= summary.worst_il_timestamp <= summary.end
+
+
+@pytest.mark.parametrize("chunk_rows", [3, 7, 10, 1000])
+def test_every_keeps_even_spacing_across_chunks(tmp_path, chunk_rows):
+    path = tmp_path / "prices.csv"
+    _write_series(path, 100)
+    result = run_backtest(str(path), every=7, chunk_rows=chunk_rows)
+    full = run_backtest(str(path))
+    np.testing.assert_array_equal(result.timestamp, full.timestamp[::7])
+    assert set(np.diff(result.timestamp).tolist()) == {7 * 60.0}
@@ -0,0 +1,77 @@
+import csv
+import io
+import json
+import os
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+
+from lp8020.cli import main
+from lp8020.il_engine import calculate_impermanent_loss_pair
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def run_cli(*args, stdin=""):
+    env = {**os.environ, "PYTHONPATH": ROOT}
+    return subprocess.run(
+        [sys.executable, "-m", "lp8020", *args], input=stdin, capture_output=True, text=True, env=env, check=False,
+    )
+
+
+def test_evaluate_csv_round_trip():
+    stdin = "name,p0_a,p1_a,p1_b\nup,1,2.5,\ndown,2,1,1.1\n"
+    result = run_cli("evaluate", "--precision", "9", stdin=stdin)
+    assert result.returncode == 0, result.stderr
+    rows = list(csv.DictReader(io.StringIO(result.stdout)))
+    assert [row["name"] for row in rows] == ["up", "down"]
+    expected, ratio = calculate_impermanent_loss_pair(np.array([1, 2]), 1.0, np.array([2.5, 1]), np.array([1.0, 1.1]))
+    np.testing.assert_allclose([float(row["il_percentage"]) for row in rows], expected, atol=1e-8)
+    np.testing.assert_allclose([float(row["pool_value_ratio"]) for row in rows], ratio, atol=1e-8)
+
+
+def test_evaluate_jsonl_round_trip():
+    stdin = json.dumps({"p0_a": 1, "p1_a": 4, "w_a": 0.5}) + "\n\n" + json.dumps({"p0_a": 1, "p1_a": 1}) + "\n"
+    result = run_cli("evaluate", "--input-format", "jsonl", "-f", "jsonl", stdin=stdin)
+    assert result.returncode == 0, result.stderr
+    records = [json.loads(line) for line in result.stdout.splitlines()]
+    assert records[0]["w_a"] == 0.5
+    assert records[0]["il_percentage"] == pytest.approx(-20.0)
+    assert records[1]["il_percentage"] == 0.0
+
+
+def test_export_csv_to_stdout():
+    result = run_cli("export", "--mult-a", "0.5:2:3", "--weights", "0.5,0.8", "--entry-price-a", "0.6")
+    assert result.returncode == 0, result.stderr
+    rows = list(csv.DictReader(io.StringIO(result.stdout)))
+    assert len(rows) == 6
+    assert {"price_a", "il_percentage", "lp_value"} <= set(rows[0])
+
+
+def test_export_parquet_round_trip(tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    target = tmp_path / "grid.parquet"
+    assert main(["export", "--mult-a", "0.1:10:50:log", "--sizes", "1,10", "-o", str(target)]) == 0
+    table = pq.read_table(target)
+    assert table.num_rows == 100
+    assert "il_percentage" in table.column_names
+
+
+def test_missing_input_file_is_a_clean_error():
+    result = run_cli("evaluate", "does-not-exist.csv")
+    assert result.returncode == 2
+    assert result.stderr.startswith("lp8020: error:")
+    assert "Traceback" not in result.stderr
+
+
+def test_missing_pyarrow_is_a_clean_error(tmp_path, monkeypatch, capsys):
+    monkeypatch.setitem(sys.modules, "pyarrow", None)
+    assert main(["export", "--mult-a", "1", "-o", str(tmp_path / "grid.parquet")]) == 2
+    assert "requires pyarrow" in capsys.readouterr().err
+
+
+def test_invalid_axis_is_a_clean_error(capsys):
+    assert main(["export", "--mult-a", "1:2:3:lin"]) == 2
+    assert "Invalid axis spacing" in capsys.readouterr().err
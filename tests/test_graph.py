@@ -0,0 +1,90 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from lp8020.graph import Graph, _same
+
+
+def make_graph(calls):
+    graph = Graph().input("price", 1.0).input("size", 100)
+
+    @graph.node("rounded", deps=("price",))
+    def rounded(price):
+        calls.append("rounded")
+        return round(price, 1)
+
+    @graph.node("value", deps=("rounded", "size"))
+    def value(rounded, size):
+        calls.append("value")
+        return rounded * size
+
+    return graph
+
+
+def test_recomputes_only_when_a_dependency_changes():
+    calls = []
+    graph = make_graph(calls)
+    assert graph.get("value") == 100.0
+    assert graph.get("value") == 100.0
+    assert calls == ["rounded", "value"]
+
+    assert graph.set("size", 100) is False
+    assert graph.get("value") == 100.0
+    assert calls == ["rounded", "value"]
+
+    assert graph.set("size", 200) is True
+    assert graph.get("value") == 200.0
+    assert calls == ["rounded", "value", "value"]
+    assert graph.stats() == {"rounded": 1, "value": 2}
+
+
+def test_equal_value_stops_propagation():
+    calls = []
+    graph = make_graph(calls)
+    graph.get("value")
+    graph.set("price", 1.04)  # still rounds to 1.0
+    assert graph.get("value") == 100.0
+    assert calls == ["rounded", "value", "rounded"]
+
+    graph.set("price", 1.26)
+    assert graph.get("value") == pytest.approx(130.0)
+    assert calls == ["rounded", "value", "rounded", "rounded", "value"]
+
+
+def test_errors():
+    graph = make_graph([])
+    with pytest.raises(ValueError):
+        graph.set("value", 1)
+    with pytest.raises(KeyError):
+        graph.node("broken", deps=("missing",))(lambda missing: missing)
+    with pytest.raises(KeyError):
+        Graph().input("unset").get("unset")
+
+
+def test_same_falls_back_for_arrays_and_frames():
+    a = np.arange(3.0)
+    assert _same(a, a)
+    assert not _same(a, a.copy())
+    assert not _same(a, np.arange(4.0))
+    frame = pd.DataFrame({"x": [1, 2]})
+    assert _same(frame, frame)
+    assert not _same(frame, frame.copy())
+    assert _same((1, "a"), (1, "a"))
+
+
+def test_array_inputs_recompute_on_a_new_object():
+    graph = Graph().input("values", np.arange(3.0))
+    calls = []
+
+    @graph.node("total", deps=("values",))
+    def total(values):
+        calls.append(1)
+        return float(values.sum())
+
+    assert graph.get("total") == 3.0
+    values = graph.get("values")
+    assert graph.set("values", values) is False
+    graph.get("total")
+    assert graph.set("values", np.arange(3.0)) is True
+    assert graph.get("total") == 3.0
+    assert len(calls) == 2
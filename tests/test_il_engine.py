@@ -0,0 +1,21 @@
+import numpy as np
+import pytest
+
+from lp8020.il_engine import calculate_impermanent_loss_80_20, calculate_impermanent_loss_pair
+
+
+@pytest.mark.parametrize("prices", [(1.0, 1.0, 2.5, 1.0), (2, 1, 1, 3), (0.62, 1.0, 0.1, 0.9)])
+def test_scalar_fast_path_matches_array_engine(prices):
+    il, ratio = calculate_impermanent_loss_80_20(*prices)
+    assert type(il) is float and type(ratio) is float
+    expected_il, expected_ratio = calculate_impermanent_loss_pair(*prices, w_a=0.8)
+    assert il == pytest.approx(expected_il, rel=1e-12)
+    assert ratio == pytest.approx(expected_ratio, rel=1e-12)
+
+
+def test_arrays_and_non_positive_prices_use_the_array_engine():
+    il, ratio = calculate_impermanent_loss_80_20(1.0, 1.0, np.array([0.5, 2.0]), 1.0)
+    assert il.shape == ratio.shape == (2,)
+    with np.errstate(invalid="ignore"):
+        il, ratio = calculate_impermanent_loss_80_20(1.0, 1.0, -1.0, 1.0)
+    assert np.isnan(il) and np.isnan(ratio)
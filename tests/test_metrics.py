@@ -0,0 +1,44 @@
+import socket
+import time
+
+import pytest
+
+from lp8020 import metrics
+from lp8020.price_feed import PriceFeed, Quote
+from lp8020.price_service import PriceService
+
+
+@pytest.fixture
+def enabled(monkeypatch):
+    monkeypatch.setattr(metrics, "_enabled", True)
+    monkeypatch.setattr(metrics, "_server", None)
+    monkeypatch.setattr(metrics, "_server_failed", False)
+
+
+def cache_counts(cache):
+    return {result: count for (name, result), count in metrics.CACHE_REQUESTS.values().items() if name == cache}
+
+
+def test_metrics_server_port_in_use_is_logged_once(enabled, caplog):
+    with socket.socket() as taken:
+        taken.bind(("127.0.0.1", 0))
+        taken.listen()
+        port = taken.getsockname()[1]
+        assert metrics.start_metrics_server(port, host="127.0.0.1") is None
+        assert metrics.start_metrics_server(port, host="127.0.0.1") is None
+    assert len([r for r in caplog.records if "metrics server" in r.message]) == 1
+
+
+def test_service_counts_snapshot_hits_and_misses(enabled):
+    class OfflineFeed(PriceFeed):
+        def get_prices(self, asset_ids, vs_currency="usd"):
+            return {}
+
+    service = PriceService(asset_ids=(), feed=OfflineFeed("http://127.0.0.1:9"))
+    service._snapshot = {"initia": Quote(0.62, 0.0, int(time.time()), time.time())}
+    before = cache_counts("price_service")
+    service.get_quotes(["initia"])
+    service.get_quotes(["initia", "bitcoin"])
+    after = cache_counts("price_service")
+    assert after.get("hit", 0) - before.get("hit", 0) == 2
+    assert after.get("miss", 0) - before.get("miss", 0) == 1
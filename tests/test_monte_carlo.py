@@ -0,0 +1,38 @@
+import numpy as np
+import pytest
+
+from lp8020.monte_carlo import _gbm_price_changes, risk_report, simulate
+
+
+def test_results_do_not_depend_on_workers():
+    kwargs = dict(paths=25_000, seed=7, chunk_paths=4_000, sigma=(0.9, 0.2), correlation=0.3)
+    serial = simulate(workers=1, **kwargs)
+    parallel = simulate(workers=3, **kwargs)
+    np.testing.assert_array_equal(serial.il_percentage, parallel.il_percentage)
+    np.testing.assert_array_equal(serial.lp_vs_hodl, parallel.lp_vs_hodl)
+    assert len(serial.il_percentage) == serial.paths == 25_000
+
+
+def test_gbm_terminal_moments():
+    horizon, mu, sigma, correlation = 0.5, np.array([0.1, -0.05]), np.array([0.8, 0.3]), 0.6
+    changes = _gbm_price_changes(np.random.default_rng(0), 400_000, horizon, mu, sigma, correlation)
+    log_change = np.log(changes)
+    np.testing.assert_allclose(log_change.mean(axis=0), (mu - 0.5 * sigma ** 2) * horizon, atol=5e-3)
+    np.testing.assert_allclose(log_change.std(axis=0), sigma * np.sqrt(horizon), rtol=1e-2)
+    np.testing.assert_allclose(np.corrcoef(log_change.T)[0, 1], correlation, atol=1e-2)
+    # E[S_T / S_0] = exp(mu * T) for GBM.
+    np.testing.assert_allclose(changes.mean(axis=0), np.exp(mu * horizon), rtol=1e-2)
+
+
+def test_risk_report_is_ordered_and_non_negative():
+    report = risk_report(simulate(50_000, seed=1, workers=1))
+    assert np.all(np.diff(report.il_percentiles) >= 0)
+    assert np.all(report.il_percentiles <= 0)
+    assert report.cvar >= report.var > 0
+
+
+def test_non_positive_paths_are_rejected():
+    with pytest.raises(ValueError):
+        simulate(0)
+    with pytest.raises(ValueError):
+        simulate(10, chunk_paths=0)
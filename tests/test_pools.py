@@ -0,0 +1,44 @@
+import re
+
+import numpy as np
+import pytest
+
+from lp8020.pools import ConcentratedPool, DynamicWeightPool, WeightedPool
+from lp8020.surface import il_surface
+from lp8020.tables import scenario_tables
+
+MULTIPLIERS = np.geomspace(0.1, 10, 9)
+
+
+def test_lbp_with_constant_weight_matches_weighted_pool():
+    lbp = DynamicWeightPool(0.8, 0.8, steps=10)
+    np.testing.assert_allclose(lbp.impermanent_loss(MULTIPLIERS, 1.3)[0], WeightedPool(0.8).impermanent_loss(MULTIPLIERS, 1.3)[0], atol=1e-9)
+
+
+def test_full_range_concentrated_pool_matches_50_50():
+    full = ConcentratedPool(1e-12, 1e12)
+    np.testing.assert_allclose(full.impermanent_loss(MULTIPLIERS, 1.0)[0], WeightedPool(0.5).impermanent_loss(MULTIPLIERS, 1.0)[0], atol=1e-3)
+
+
+def test_concentrated_pool_at_upper_bound():
+    il, ratio = ConcentratedPool(0.5, 2.0).impermanent_loss(2.0, 1.0)
+    assert np.isclose(ratio, 1.2071067811865477)
+    assert np.isclose(il, -19.526214587563484)
+
+
+def test_pump_table_prints_signed_differences():
+    html = scenario_tables(0.6, pool=DynamicWeightPool(0.5, 0.9)).pump_html
+    assert "-$-" not in html
+    assert re.search(r'class="green">\$\+\d+</td></tr>', html)
+
+
+def test_surface_keeps_the_sign_of_il():
+    _, _, z = il_surface(pool=DynamicWeightPool(0.9, 0.5), resolution=50)
+    assert z.max() > 0 > z.min()
+
+
+def test_surface_rejects_more_than_two_weights():
+    with pytest.raises(ValueError, match="3 weights"):
+        il_surface((0.5, 0.3, 0.2), resolution=10)
+    _, _, z = il_surface((2, 8), resolution=10)
+    np.testing.assert_allclose(z, il_surface(pool=WeightedPool(0.2), resolution=10)[2])
@@ -0,0 +1,48 @@
+import gc
+import io
+
+import numpy as np
+
+from lp8020.portfolio import Portfolio
+
+POSITIONS = (
+    "id,pool,asset_a,asset_b,weight_a,entry_price_a,entry_price_b,size\n"
+    "1,init-usdc,initia,usd-coin,0.8,0.5,1.0,1000\n"
+    "2,btc-eth,bitcoin,ethereum,0.5,60000,3000,500\n"
+    "3,ghost,nonexistent-coin,usd-coin,0.8,1.0,1.0,100\n"
+)
+
+
+class StubService:
+    def __init__(self, prices):
+        self.prices = prices
+        self.requests = []
+
+    def get_quotes(self, asset_ids):
+        self.requests.append(list(asset_ids))
+        return {asset: type("Quote", (), {"price": self.prices[asset]})() for asset in asset_ids if asset in self.prices}
+
+
+def test_from_file_leaves_binary_upload_open():
+    upload = io.BytesIO(POSITIONS.encode())
+    portfolio = Portfolio.from_file(upload)
+    gc.collect()
+    assert not upload.closed
+    assert upload.read() == b""
+    assert len(portfolio) == 3
+
+
+def test_set_prices_recomputes_only_affected_positions():
+    portfolio = Portfolio.from_file(io.BytesIO(POSITIONS.encode()))
+    assert portfolio.set_prices({"initia": 1.0, "usd-coin": 1.0, "bitcoin": 60000, "ethereum": 3000}) == 3
+    assert portfolio.set_prices({"bitcoin": 66000}) == 1
+    assert portfolio.set_prices({"bitcoin": 66000}) == 0
+
+
+def test_unpriced_assets_leave_positions_unpriced():
+    portfolio = Portfolio.from_file(io.BytesIO(POSITIONS.encode()))
+    portfolio.refresh(StubService({"initia": 1.0, "usd-coin": 1.0, "bitcoin": 60000, "ethereum": 3000}))
+    summary = portfolio.summary()
+    assert summary.positions == 3
+    assert summary.priced == 2
+    assert np.isnan(portfolio.positions()["lp_value"][2])
@@ -0,0 +1,158 @@
+import threading
+import time
+from http.server import ThreadingHTTPServer
+
+import pytest
+
+from benchmarks.stub_server import StubPriceHandler
+from lp8020.price_feed import PriceFeed, PriceFeedError
+from lp8020.price_service import PriceService
+
+
+class CountingHandler(StubPriceHandler):
+    # Per-server state lives on the server object: hits, delay, a forced
+    # status code (with Retry-After) and the prices to serve.
+
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.hits += 1
+        time.sleep(server.delay)
+        if server.status is not None:
+            self.send_response(server.status)
+            self.send_header("Retry-After", str(server.retry_after))
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        self.prices = server.prices
+        super().do_GET()
+
+
+@pytest.fixture
+def stub():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), CountingHandler)
+    server.lock = threading.Lock()
+    server.hits = 0
+    server.delay = 0.0
+    server.status = None
+    server.retry_after = 1
+    server.prices = {"initia": 0.62, "usd-coin": 1.0}
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    server.url = f"http://127.0.0.1:{server.server_address[1]}"
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_fresh_quotes_are_served_from_memory(stub):
+    feed = PriceFeed(stub.url, ttl=60)
+    assert feed.get_price("initia").price == 0.62
+    assert feed.get_price("initia").price == 0.62
+    assert stub.hits == 1
+
+
+def test_unlisted_ids_are_negatively_cached(stub):
+    feed = PriceFeed(stub.url, ttl=60, negative_ttl=0.3)
+    for _ in range(5):
+        with pytest.raises(PriceFeedError, match="nonexistent-coin"):
+            feed.get_price("nonexistent-coin")
+    assert stub.hits == 1
+
+    # A batch with a known id still fetches it, but not the unlisted one.
+    assert set(feed.get_prices(["initia", "nonexistent-coin"])) == {"initia"}
+    assert stub.hits == 2
+    feed.get_prices(["initia", "nonexistent-coin"])
+    assert stub.hits == 2
+
+    time.sleep(0.35)
+    assert feed.get_prices(["nonexistent-coin"]) == {}
+    assert stub.hits == 3
+
+
+def test_service_does_not_refetch_unlisted_ids(stub):
+    service = PriceService(asset_ids=("initia",), feed=PriceFeed(stub.url, ttl=60))
+    for _ in range(7):
+        assert "nonexistent-coin" not in service.get_quotes(["initia", "nonexistent-coin"])
+    # One batched request on the cold start; the unlisted id is then served
+    # from the negative cache on every later call.
+    assert stub.hits == 1
+    assert "nonexistent-coin" not in service.asset_ids
+
+
+def test_concurrent_misses_are_coalesced(stub):
+    stub.delay = 0.3
+    feed = PriceFeed(stub.url, ttl=60)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(feed.get_price("initia").price)) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results == [0.62] * 8
+    assert stub.hits == 1
+
+
+def test_stale_quotes_are_served_while_revalidating(stub):
+    feed = PriceFeed(stub.url, ttl=0.1, max_stale=60)
+    assert feed.get_price("initia").price == 0.62
+    time.sleep(0.15)
+    stub.prices = {"initia": 0.70}
+    stub.delay = 0.3
+
+    started = time.perf_counter()
+    assert feed.get_price("initia").price == 0.62
+    assert time.perf_counter() - started < 0.2
+
+    deadline = time.time() + 2
+    while feed.get_price("initia").price != 0.70 and time.time() < deadline:
+        time.sleep(0.05)
+    assert feed.get_price("initia").price == 0.70
+    assert stub.hits == 2
+
+
+def test_rate_limit_backs_off_and_serves_cached_quotes(stub):
+    feed = PriceFeed(stub.url, ttl=0.05, max_stale=0.1, min_backoff=0.5)
+    assert feed.get_price("initia").price == 0.62
+
+    stub.status, stub.retry_after = 429, 1
+    time.sleep(0.15)
+    # Past max_stale: the miss goes upstream, gets a 429 and enters backoff.
+    with pytest.raises(PriceFeedError, match="Rate limited"):
+        feed.get_price("usd-coin")
+    hits = stub.hits
+
+    # During backoff nothing goes upstream, and cached quotes are served even
+    # though they are older than max_stale.
+    for _ in range(5):
+        assert feed.get_price("initia").price == 0.62
+    with pytest.raises(PriceFeedError, match="Rate limited"):
+        feed.get_price("bitcoin")
+    assert stub.hits == hits
+
+    # Retry-After (1s) wins over the shorter minimum backoff.
+    stub.status = None
+    time.sleep(0.6)
+    feed.get_prices(["initia"])
+    assert stub.hits == hits
+    time.sleep(0.5)
+    deadline = time.time() + 2
+    while feed.get_price("initia").fetched_at < time.time() - 0.5 and time.time() < deadline:
+        time.sleep(0.05)
+    assert stub.hits > hits
+
+
+def test_service_snapshot_ages_out_past_max_stale(stub):
+    feed = PriceFeed(stub.url, ttl=0.1, max_stale=0.5, negative_ttl=0.1)
+    service = PriceService(asset_ids=("initia",), feed=feed)
+    assert service.get_quotes(["initia"])["initia"].price == 0.62
+    assert set(feed.fetch_many(["initia"])) == {"initia"}
+
+    stub.status = 500
+    time.sleep(0.6)
+    assert feed.fetch_many(["initia"]) == {}
+    assert feed.get_prices(["initia"]) == {}
+    assert service.get_quotes(["initia"]) == {}
+
+    stub.status = None
+    time.sleep(0.15)
+    assert service.get_quotes(["initia"])["initia"].price == 0.62
@@ -0,0 +1,93 @@
+import os
+import time
+
+import numpy as np
+import pytest
+
+from lp8020.price_store import RECORD_DTYPE, PriceStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    return PriceStore(str(tmp_path))
+
+
+def test_append_and_read_round_trip(store):
+    store.append("initia-usd", [1.0, 2.0], [0.5, 0.6])
+    store.append("initia-usd", 3.0, 0.7)
+    history = store.read("initia-usd")
+    np.testing.assert_array_equal(history.timestamp, [1.0, 2.0, 3.0])
+    np.testing.assert_array_equal(history.price, [0.5, 0.6, 0.7])
+    np.testing.assert_array_equal(store.read("initia-usd", since=2.0).price, [0.6, 0.7])
+    assert store.latest("initia-usd") == (3.0, 0.7)
+    assert store.series() == ["initia-usd"]
+
+
+def test_missing_series_reads_empty(store):
+    assert len(store.read("nope").timestamp) == 0
+    assert store.latest("nope") is None
+
+
+def test_append_rejects_mismatched_columns(store):
+    with pytest.raises(ValueError):
+        store.append("initia-usd", [1.0, 2.0], [0.5])
+
+
+def test_compact_sorts_deduplicates_and_thins(store):
+    now = time.time()
+    old = np.floor((now - 30 * 86400) / 300) * 300
+    store.append("initia-usd", [now, now - 10, now], [3.0, 1.0, 4.0])
+    store.append("initia-usd", [old + 1, old + 2, old + 3], [10.0, 11.0, 12.0])
+    assert store.compact("initia-usd") == 3
+    history = store.read("initia-usd")
+    np.testing.assert_array_equal(history.timestamp, [old + 3, now - 10, now])
+    # The last write wins for a duplicate timestamp.
+    np.testing.assert_array_equal(history.price, [12.0, 1.0, 4.0])
+
+
+def test_partial_record_is_dropped_before_the_next_append(store):
+    store.append("initia-usd", [1.0, 2.0], [0.5, 0.6])
+    with open(store._file("initia-usd"), "ab") as f:
+        f.write(b"\x00" * 5)  # crash half-way through a record
+    np.testing.assert_array_equal(store.read("initia-usd").timestamp, [1.0, 2.0])
+    store.append("initia-usd", 3.0, 0.7)
+    history = store.read("initia-usd")
+    np.testing.assert_array_equal(history.timestamp, [1.0, 2.0, 3.0])
+    np.testing.assert_array_equal(history.price, [0.5, 0.6, 0.7])
+
+
+def test_failed_compaction_keeps_rows_paired(store, monkeypatch):
+    timestamps = np.arange(14, dtype=float)[::-1]
+    store.append("initia-usd", timestamps, timestamps * 10)
+
+    def crash(src, dst):
+        raise OSError("disk gone")
+    monkeypatch.setattr(os, "replace", crash)
+    with pytest.raises(OSError):
+        store.compact("initia-usd", keep_full_seconds=None)
+    monkeypatch.undo()
+
+    store.append("initia-usd", 100.0, 1000.0)
+    history = store.read("initia-usd")
+    assert len(history.timestamp) == 15
+    np.testing.assert_array_equal(history.price, history.timestamp * 10)
+
+
+def test_reader_keeps_its_generation_across_compaction(store):
+    store.append("initia-usd", [3.0, 1.0, 2.0], [30.0, 10.0, 20.0])
+    before = store.read("initia-usd")
+    store.compact("initia-usd", keep_full_seconds=None)
+    store.append("initia-usd", 4.0, 40.0)
+    np.testing.assert_array_equal(before.price, before.timestamp * 10)
+    np.testing.assert_array_equal(store.read("initia-usd").timestamp, [1.0, 2.0, 3.0, 4.0])
+
+
+def test_legacy_column_files_are_migrated(tmp_path):
+    np.array([1.0, 2.0, 3.0]).tofile(tmp_path / "initia-usd.ts")
+    np.array([0.5, 0.6]).tofile(tmp_path / "initia-usd.px")  # torn legacy write
+    store = PriceStore(str(tmp_path))
+    history = store.read("initia-usd")
+    np.testing.assert_array_equal(history.timestamp, [1.0, 2.0])
+    np.testing.assert_array_equal(history.price, [0.5, 0.6])
+    assert sorted(os.listdir(tmp_path)) == ["initia-usd.dat"]
+    assert os.path.getsize(tmp_path / "initia-usd.dat") == 2 * RECORD_DTYPE.itemsize
@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+
+from lp8020.solver import (
+    breakeven_days,
+    breakeven_fee_apr,
+    breakeven_price_range,
+    fee_return,
+    value_ratio,
+)
+
+FEE_APRS = np.array([0.01, 0.1, 0.5, 2.0])
+
+
+@pytest.mark.parametrize("w_a", [0.5, 0.8, 0.95])
+@pytest.mark.parametrize("compounding", [False, True])
+def test_range_edges_break_even_with_fees(w_a, compounding):
+    low, high = breakeven_price_range(FEE_APRS, 90, w_a=w_a, compounding=compounding)
+    assert np.all(low < 1) and np.all(high > 1)
+    fees = fee_return(FEE_APRS, 90, compounding=compounding)
+    np.testing.assert_allclose(value_ratio(low, w_a) * (1 + fees), 1.0, rtol=1e-9)
+    np.testing.assert_allclose(value_ratio(high, w_a) * (1 + fees), 1.0, rtol=1e-9)
+
+
+def test_50_50_closed_form_matches_newton():
+    closed = breakeven_price_range(FEE_APRS, 30, w_a=0.5)
+    # Mixing in another weight sends every element, 50/50 included, through
+    # the Newton solver.
+    newton = breakeven_price_range(FEE_APRS[:, None], 30, w_a=np.array([0.5, 0.8]))
+    np.testing.assert_allclose(newton.low[:, 0], closed.low, rtol=1e-9)
+    np.testing.assert_allclose(newton.high[:, 0], closed.high, rtol=1e-9)
+
+
+def test_zero_and_negative_fees():
+    assert breakeven_price_range(0.0, 30) == (1.0, 1.0)
+    low, high = breakeven_price_range(-0.1, 30)
+    assert np.isnan(low) and np.isnan(high)
+    low, high = breakeven_price_range(np.array([0.0, -0.1, 0.1]), 30)
+    np.testing.assert_array_equal(low[:2], [1.0, np.nan])
+    assert 0 < low[2] < 1
+
+
+def test_invalid_weight_is_rejected():
+    with pytest.raises(ValueError):
+        breakeven_price_range(0.1, 30, w_a=1.0)
+
+
+def test_breakeven_fee_apr_and_days_invert_each_other():
+    ratios = np.array([0.2, 0.5, 2.0, 5.0])
+    for days in (7, 30, 365):
+        apr = breakeven_fee_apr(ratios, days, w_a=0.8)
+        np.testing.assert_allclose(breakeven_days(ratios, apr, w_a=0.8), days, rtol=1e-12)
+    days = breakeven_days(ratios, 0.3, w_a=0.8)
+    np.testing.assert_allclose(breakeven_fee_apr(ratios, days, w_a=0.8), 0.3, rtol=1e-12)
+    assert breakeven_days(2.0, 0.0) == np.inf
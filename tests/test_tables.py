@@ -0,0 +1,16 @@
+from lp8020.pools import WeightedPool
+from lp8020.tables import compute_scenarios, scenario_tables
+
+
+def test_scenario_tables_are_memoized_on_price_and_pool():
+    first = scenario_tables(0.62)
+    assert scenario_tables(0.62) is first
+    assert scenario_tables(0.62, pool=WeightedPool(0.8)) is first
+    assert scenario_tables(0.63) is not first
+
+
+def test_compute_scenarios_matches_weighted_formula():
+    columns = compute_scenarios(0.5, [2.0], position_size=1000, weight_a=0.8)
+    assert columns["new_price"][0] == 1.0
+    assert round(columns["hodl_weighted"][0], 6) == 1800.0
+    assert round(columns["lp_value"][0], 6) == round(1000 * 2.0 ** 0.8, 6)